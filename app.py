@@ -1,12 +1,25 @@
+import time
+PROCESS_START = time.time() # 기동 시간 측정 기준
+
+import os
 import logging
 from flask import Flask, request
 from safety import ai_bp
 from safety import database # DB 모듈 임포트
+from safety import routes
+from safety.startup import timer
+
+timer.start = PROCESS_START
+
+DEBUG = os.environ.get('SAFETY_DEBUG', '1') == '1'
+PORT = int(os.environ.get('SAFETY_PORT', 5000)) # 워커 여러 개를 한 호스트에서 실행할 때 포트 변경
 
 # 특정 경로 로그를 무시하는 필터
 class NoHealthChecksFilter(logging.Filter):
     def filter(self, record):
-        return '/get_logs' not in record.getMessage()
+        message = record.getMessage()
+        return '/get_logs' not in message and '/health' not in message and '/ready' not in message \
+            and '/worker/' not in message
 
 # Flask(Werkzeug) 로거에 필터 적용
 log = logging.getLogger('werkzeug')
@@ -25,6 +38,13 @@ with app.app_context():
     except Exception as e:
         print(f"DB 초기화 실패: {e}")
 
+timer.mark('app_created')
+
 if __name__ == '__main__':
+    # [추가] 모델 백그라운드 로딩 + 소스별 백그라운드 모니터링 시작
+    # (디버그 리로더의 감시용 부모 프로세스에서는 시작하지 않음)
+    if not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        routes.start_background()
+
     # 디버그 모드로 실행 (코드 수정 시 자동 재시작)
-    app.run(debug=True, port=5000)
+    app.run(debug=DEBUG, port=PORT, threaded=True)
@@ -1,3 +1,5 @@
+import os
+import sys
 from ultralytics import YOLO
 
 # 다운로드할 모델 목록
@@ -21,3 +23,24 @@ for model_name in models:
         print(f"-> {model_name} 다운로드 실패: {e}")
 
 print("\n모든 작업이 완료되었습니다.")
+
+# [추가] CPU용 INT8 양자화 모델 생성 및 속도/정확도 비교
+#   python download_models.py --int8 [비교용 영상 경로]
+if '--int8' in sys.argv:
+    from safety import tuning
+
+    args = [a for a in sys.argv[1:] if a != '--int8']
+    clip_path = args[0] if args else os.path.join('safety', 'static', 'uploads', 'CCTV1.mp4')
+    frames = tuning.read_clip(clip_path, num_frames=30, stride=5)
+
+    print(f"\nINT8 양자화 및 벤치마크 시작 (비교 영상: {clip_path})")
+    for model_name in models:
+        try:
+            path = tuning.export_int8(model_name)
+            print(f"-> {model_name} INT8 변환 완료: {path}")
+            if frames:
+                report = tuning.benchmark_int8(model_name, frames)
+                print(f"   FP32 {report['fp32_ms']}ms / INT8 {report['int8_ms']}ms "
+                      f"(x{report['speedup']}), 키포인트 오차 {report['error']}, 검출률 {report['recall']}")
+        except Exception as e:
+            print(f"-> {model_name} INT8 변환 실패: {e}")
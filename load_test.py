@@ -0,0 +1,393 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+import urllib.error
+import urllib.parse
+
+# 부하 테스트: 카메라 N대 x 대시보드 시청자 M명
+# - uploads 폴더의 영상을 원본 FPS로 반복 재생해서 RTSP 카메라 대신 사용
+# - 시청자마다 /video_feed MJPEG 스트림 + /get_logs(1초) + /api/stats 폴링
+# - 단계별로 시청자당 수신 FPS, 촬영->수신 지연, CPU/메모리, 오류율을 출력
+#
+#   python load_test.py --cameras 1,2,4 --viewers 1,4,8 --duration 30
+#
+# 서버는 별도 설정 파일(SAFETY_CONFIG_FILE)과 별도 DB(SAFETY_DB_NAME)로 실행되므로
+# 실제 설정과 로그에는 영향이 없음 (로컬 MySQL 필요, 없으면 DB 관련 요청은 오류로 집계)
+
+try:
+    import psutil # 선택 사항 (없으면 /proc 사용)
+except ImportError:
+    psutil = None
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+UPLOAD_FOLDER = os.path.join(PROJECT_ROOT, 'safety', 'static', 'uploads')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+# 테스트용 서버 (디버그 리로더 없이 실행)
+SERVER_CODE = '''
+import sys
+import app
+app.routes.ai_system.cache_results = sys.argv[2] == '1'
+app.routes.start_background()
+app.app.run(port=int(sys.argv[1]), threaded=True)
+'''
+
+
+# 측정 구간 (워밍업 이후부터만 집계)
+class Window:
+    def __init__(self):
+        self.start = None
+        self.end = None
+
+    def active(self, now):
+        return self.start is not None and now >= self.start and (self.end is None or now < self.end)
+
+
+class ViewerStats:
+    def __init__(self, source):
+        self.source = source
+        self.frames = 0
+        self.bytes = 0
+        self.latencies = []
+        self.errors = 0
+
+
+class PollStats:
+    def __init__(self, path):
+        self.path = path
+        self.requests = 0
+        self.errors = 0
+        self.latencies = []
+
+
+def percentile(values, p):
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))
+    return values[idx]
+
+
+def read_part(resp):
+    # MJPEG 파트 하나 읽기 -> (jpeg 바이트, 캡처 시각 또는 None)
+    line = resp.readline()
+    while line and not line.startswith(b'--frame'):
+        line = resp.readline()
+    if not line:
+        return None, None
+
+    headers = {}
+    while True:
+        line = resp.readline()
+        if not line:
+            return None, None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if 'content-length' in headers:
+        data = resp.read(int(headers['content-length']))
+    else:
+        # Content-Length 가 없는 스트림이면 JPEG 끝 표시(FFD9)까지 읽음
+        data = b''
+        while not data.endswith(b'\xff\xd9'):
+            chunk = resp.read(1)
+            if not chunk:
+                return None, None
+            data += chunk
+
+    timestamp = headers.get('x-timestamp')
+    return data, float(timestamp) if timestamp else None
+
+
+def run_viewer(url, stats, window, stop):
+    # MJPEG 시청자 (연결이 끊기면 오류로 집계하고 재연결)
+    while not stop.is_set():
+        try:
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                while not stop.is_set():
+                    data, capture_time = read_part(resp)
+                    if data is None:
+                        raise ConnectionError('stream closed')
+                    now = time.time()
+                    if window.active(now):
+                        stats.frames += 1
+                        stats.bytes += len(data)
+                        if capture_time:
+                            stats.latencies.append((now - capture_time) * 1000)
+        except Exception:
+            if stop.is_set():
+                return
+            if window.active(time.time()):
+                stats.errors += 1
+            time.sleep(0.5)
+
+
+def run_poller(url, interval, stats, window, stop):
+    while not stop.is_set():
+        start = time.time()
+        ok = False
+        try:
+            with urllib.request.urlopen(url, timeout=10) as resp:
+                resp.read()
+                ok = resp.status == 200
+        except Exception:
+            ok = False
+        elapsed = time.time() - start
+        if window.active(start):
+            stats.requests += 1
+            stats.latencies.append(elapsed * 1000)
+            if not ok:
+                stats.errors += 1
+        stop.wait(max(0.0, interval - elapsed))
+
+
+class ProcessSampler:
+    # 서버 프로세스 CPU(%) / 메모리(MB) 주기적 측정
+    def __init__(self, pid, interval=1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self.page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def _proc_times(self):
+        with open(f'/proc/{self.pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / self.ticks # utime + stime
+        with open(f'/proc/{self.pid}/statm') as f:
+            rss = int(f.read().split()[1]) * self.page_size
+        return cpu, rss
+
+    def _run(self):
+        if psutil is not None:
+            proc = psutil.Process(self.pid)
+            proc.cpu_percent(None)
+            while not self.stop.wait(self.interval):
+                try:
+                    self.samples.append((time.time(), proc.cpu_percent(None), proc.memory_info().rss))
+                except psutil.Error:
+                    return
+            return
+
+        try:
+            prev_cpu, _ = self._proc_times()
+        except OSError:
+            return # psutil 도 /proc 도 없으면 측정 생략
+        prev_time = time.time()
+        while not self.stop.wait(self.interval):
+            try:
+                cpu, rss = self._proc_times()
+            except OSError:
+                return
+            now = time.time()
+            self.samples.append((now, (cpu - prev_cpu) / (now - prev_time) * 100, rss))
+            prev_cpu, prev_time = cpu, now
+
+    def start(self):
+        self.thread.start()
+
+    def summary(self, window):
+        samples = [s for s in self.samples if window.active(s[0])]
+        if not samples:
+            return {'cpu_avg': None, 'cpu_max': None, 'rss_mb_max': None}
+        cpus = [s[1] for s in samples]
+        return {
+            'cpu_avg': round(sum(cpus) / len(cpus), 1),
+            'cpu_max': round(max(cpus), 1),
+            'rss_mb_max': round(max(s[2] for s in samples) / (1024 * 1024), 1)
+        }
+
+
+def list_clips(names=None):
+    clips = sorted(f for f in os.listdir(UPLOAD_FOLDER) if f.lower().endswith(VIDEO_EXTENSIONS))
+    if names:
+        clips = [c for c in clips if c in names]
+    if not clips:
+        raise SystemExit(f"테스트용 영상이 없습니다: {UPLOAD_FOLDER}")
+    return clips
+
+
+def make_cameras(work_dir, clips, count):
+    # 카메라마다 별도 파일 이름 (영상 반복 사용, 링크로 생성) -> 설정 키 = 절대 경로
+    cam_dir = os.path.join(work_dir, f'cameras-{count}')
+    os.makedirs(cam_dir, exist_ok=True)
+    config = {}
+    for i in range(count):
+        clip = clips[i % len(clips)]
+        path = os.path.join(cam_dir, f'cam{i + 1:02d}_{clip}')
+        if not os.path.exists(path):
+            try:
+                os.symlink(os.path.join(UPLOAD_FOLDER, clip), path)
+            except OSError:
+                import shutil
+                shutil.copyfile(os.path.join(UPLOAD_FOLDER, clip), path)
+        config[path] = {'monitor': True}
+    return config
+
+
+def wait_ready(base_url, timeout):
+    # 모델 로딩 완료(/ready 200) 대기
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + '/ready', timeout=5) as resp:
+                if resp.status == 200:
+                    return True
+        except urllib.error.HTTPError:
+            pass
+        except Exception:
+            pass
+        time.sleep(1.0)
+    return False
+
+
+def start_server(args, config, work_dir):
+    config_path = os.path.join(work_dir, 'config.json')
+    with open(config_path, 'w') as f:
+        json.dump(config, f, indent=4)
+
+    env = dict(os.environ)
+    env['SAFETY_CONFIG_FILE'] = config_path
+    env['SAFETY_DB_NAME'] = args.db_name
+    log = open(os.path.join(work_dir, f'server-{len(config)}.log'), 'w')
+    proc = subprocess.Popen([sys.executable, '-c', SERVER_CODE, str(args.port), '1' if args.cache else '0'],
+                            cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    return proc, log
+
+
+def stop_server(proc, log):
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    log.close()
+
+
+def run_step(args, base_url, sources, viewers, sampler):
+    window = Window()
+    stop = threading.Event()
+    threads = []
+    viewer_stats = []
+    poll_stats = {'/get_logs': PollStats('/get_logs'), '/api/stats': PollStats('/api/stats')}
+
+    for i in range(viewers):
+        source = sources[i % len(sources)]
+        stats = ViewerStats(source)
+        viewer_stats.append(stats)
+        url = base_url + '/video_feed?source=' + urllib.parse.quote(source, safe='')
+        threads.append(threading.Thread(target=run_viewer, args=(url, stats, window, stop), daemon=True))
+        # 대시보드와 같은 주기로 로그 폴링, 통계는 느린 주기로 폴링
+        threads.append(threading.Thread(target=run_poller, args=(
+            base_url + '/get_logs', 1.0, poll_stats['/get_logs'], window, stop), daemon=True))
+        threads.append(threading.Thread(target=run_poller, args=(
+            base_url + '/api/stats', args.stats_interval, poll_stats['/api/stats'], window, stop), daemon=True))
+
+    for t in threads:
+        t.start()
+
+    window.start = time.time() + args.warmup
+    window.end = window.start + args.duration
+    time.sleep(args.warmup + args.duration)
+    stop.set()
+    for t in threads:
+        t.join(timeout=15)
+
+    fps = [s.frames / args.duration for s in viewer_stats]
+    latencies = [l for s in viewer_stats for l in s.latencies]
+    result = {
+        'viewers': viewers,
+        'fps_min': round(min(fps), 1) if fps else None,
+        'fps_avg': round(sum(fps) / len(fps), 1) if fps else None,
+        'latency_p50_ms': round(percentile(latencies, 50), 1) if latencies else None,
+        'latency_p95_ms': round(percentile(latencies, 95), 1) if latencies else None,
+        'stream_errors': sum(s.errors for s in viewer_stats),
+        'mbps': round(sum(s.bytes for s in viewer_stats) * 8 / args.duration / 1e6, 2),
+        'per_viewer': [{'source': os.path.basename(s.source), 'fps': round(s.frames / args.duration, 1),
+                        'errors': s.errors} for s in viewer_stats]
+    }
+    for path, stats in poll_stats.items():
+        key = path.strip('/').replace('/', '_')
+        result[key] = {
+            'requests': stats.requests,
+            'error_rate': round(stats.errors / stats.requests, 3) if stats.requests else None,
+            'p95_ms': round(percentile(stats.latencies, 95), 1) if stats.latencies else None
+        }
+    result.update(sampler.summary(window))
+    return result
+
+
+def print_row(cameras, r):
+    def fmt(value):
+        return '-' if value is None else str(value)
+    print(f"{cameras:>4} {r['viewers']:>4} {fmt(r['fps_avg']):>8} {fmt(r['fps_min']):>8} "
+          f"{fmt(r['latency_p50_ms']):>9} {fmt(r['latency_p95_ms']):>9} {fmt(r['cpu_avg']):>7} "
+          f"{fmt(r['rss_mb_max']):>8} {r['stream_errors']:>6} "
+          f"{fmt(r['get_logs']['error_rate']):>8} {fmt(r['api_stats']['error_rate']):>8}")
+
+
+def parse_list(value):
+    return [int(v) for v in value.split(',') if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='카메라 N대 x 시청자 M명 부하 테스트')
+    parser.add_argument('--cameras', default='1,2,4', help='카메라 수 단계 (예: 1,2,4)')
+    parser.add_argument('--viewers', default='1,4,8', help='시청자 수 단계 (예: 1,4,8)')
+    parser.add_argument('--duration', type=float, default=30, help='단계별 측정 시간 (초)')
+    parser.add_argument('--warmup', type=float, default=5, help='단계별 측정 전 대기 시간 (초)')
+    parser.add_argument('--stats-interval', type=float, default=10, help='/api/stats 폴링 주기 (초)')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--db-name', default='AI_Project_loadtest', help='테스트용 DB 이름')
+    parser.add_argument('--clips', nargs='*', help='사용할 영상 (기본: uploads 폴더 전체)')
+    parser.add_argument('--cache', action='store_true', help='추론 결과 캐시 사용 (기본: 실시간 카메라처럼 매번 추론)')
+    parser.add_argument('--ready-timeout', type=float, default=300, help='모델 준비 대기 시간 (초)')
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    args = parser.parse_args()
+
+    clips = list_clips(args.clips)
+    base_url = f'http://127.0.0.1:{args.port}'
+    results = []
+
+    print(f"부하 테스트 시작 (영상: {', '.join(clips)}, CPU/메모리: {'psutil' if psutil else '/proc'})")
+    print(f"{'cam':>4} {'view':>4} {'fps_avg':>8} {'fps_min':>8} {'lat_p50':>9} {'lat_p95':>9} "
+          f"{'cpu%':>7} {'rss_mb':>8} {'s_err':>6} {'logs_er':>8} {'stat_er':>8}")
+
+    with tempfile.TemporaryDirectory(prefix='safety-loadtest-') as work_dir:
+        for cameras in parse_list(args.cameras):
+            config = make_cameras(work_dir, clips, cameras)
+            proc, log = start_server(args, config, work_dir)
+            try:
+                if not wait_ready(base_url, args.ready_timeout):
+                    print(f"[경고] {args.ready_timeout}초 안에 모델이 준비되지 않았습니다 (원본 영상만 측정)")
+                sampler = ProcessSampler(proc.pid)
+                sampler.start()
+                for viewers in parse_list(args.viewers):
+                    r = run_step(args, base_url, list(config.keys()), viewers, sampler)
+                    r['cameras'] = cameras
+                    results.append(r)
+                    print_row(cameras, r)
+                sampler.stop.set()
+            finally:
+                stop_server(proc, log)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
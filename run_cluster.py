@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import secrets
+import argparse
+import subprocess
+
+# 로컬 테스트용 클러스터 실행: 코디네이터 1개 + 워커 N개 (모두 localhost)
+#   python run_cluster.py --workers 3
+# 대시보드는 코디네이터 주소(기본 http://127.0.0.1:5000)로 접속
+# 워커 하나를 종료하면 남은 워커로 소스가 다시 배정됨
+# 코디네이터 <-> 워커 API 토큰(SAFETY_WORKER_TOKEN)이 없으면 실행할 때마다 새로 만들어서 공유
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def start(role, port, extra_env=None):
+    env = dict(os.environ)
+    env.update({'SAFETY_ROLE': role, 'SAFETY_PORT': str(port), 'SAFETY_DEBUG': '0'})
+    env.update(extra_env or {})
+    print(f"{role} 시작: http://127.0.0.1:{port}")
+    return subprocess.Popen([sys.executable, 'app.py'], cwd=PROJECT_ROOT, env=env)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='코디네이터 + 워커 로컬 실행')
+    parser.add_argument('--workers', type=int, default=2, help='워커 수')
+    parser.add_argument('--port', type=int, default=5000, help='코디네이터 포트')
+    parser.add_argument('--worker-port', type=int, default=5101, help='첫 번째 워커 포트')
+    args = parser.parse_args()
+
+    token = {'SAFETY_WORKER_TOKEN': os.environ.get('SAFETY_WORKER_TOKEN') or secrets.token_hex(16)}
+    worker_ports = [args.worker_port + i for i in range(args.workers)]
+    procs = [start('worker', port, token) for port in worker_ports]
+    worker_urls = ','.join(f"http://127.0.0.1:{port}" for port in worker_ports)
+    procs.append(start('coordinator', args.port, dict(token, SAFETY_WORKERS=worker_urls)))
+
+    try:
+        while procs[-1].poll() is None: # 코디네이터가 종료될 때까지
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            try:
+                p.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                p.kill()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+import os
+import glob
+import gzip
+import json
+from collections import deque
+
+# 로그 보관(archive) 파일
+# - 하루 단위 gzip NDJSON: archive/logs/YYYY/logs-YYYY-MM-DD.ndjson.gz
+# - 같은 위치의 요약 파일(logs-YYYY-MM-DD.summary.json)로 통계는 압축 해제 없이 계산
+# - 로그 조회는 파일을 한 줄씩 읽어서 필요한 개수만 메모리에 유지
+
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive', 'logs')
+
+
+def archive_path(date):
+    return os.path.join(ARCHIVE_DIR, date[:4], f"logs-{date}.ndjson.gz")
+
+
+def summary_path(date):
+    return os.path.join(ARCHIVE_DIR, date[:4], f"logs-{date}.summary.json")
+
+
+def _new_summary(date):
+    return {'date': date, 'count': 0, 'levels': {}, 'danger_by_source': {}, 'sources': []}
+
+
+def _add_to_summary(summary, row, sources):
+    summary['count'] += 1
+    level = row.get('level')
+    summary['levels'][level] = summary['levels'].get(level, 0) + 1
+    source = row.get('source') or 'Unknown'
+    sources.add(source)
+    if level == 'danger':
+        summary['danger_by_source'][source] = summary['danger_by_source'].get(source, 0) + 1
+
+
+class ArchiveWriter:
+    # 하루치 로그 보관 파일 작성 (이미 파일이 있으면 이어서 합침, id 중복 제거)
+    def __init__(self, date):
+        self.date = date
+        self.path = archive_path(date)
+        self.tmp_path = self.path + '.part'
+        self.summary = _new_summary(date)
+        self.sources = set()
+        self.seen_ids = set()
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.file = gzip.open(self.tmp_path, 'wt', encoding='utf-8')
+
+        # 이전 실행에서 파일만 쓰고 삭제 전에 중단된 경우를 대비해 기존 내용 유지
+        if os.path.exists(self.path):
+            for row in iter_archived_logs(date):
+                self.write(row)
+
+    def write(self, row):
+        row_id = row.get('id')
+        if row_id is not None:
+            if row_id in self.seen_ids:
+                return
+            self.seen_ids.add(row_id)
+        self.file.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+        _add_to_summary(self.summary, row, self.sources)
+
+    def close(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+        self.summary['sources'] = sorted(self.sources)
+        tmp = summary_path(self.date) + '.part'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.summary, f, ensure_ascii=False)
+        os.replace(tmp, summary_path(self.date))
+        return self.summary
+
+    def abort(self):
+        self.file.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def archived_dates():
+    pattern = os.path.join(ARCHIVE_DIR, '*', 'logs-*.summary.json')
+    dates = [os.path.basename(p)[len('logs-'):-len('.summary.json')] for p in glob.glob(pattern)]
+    return sorted(dates)
+
+
+def read_summaries(start_date=None):
+    # {날짜: 요약} (start_date 이후만)
+    summaries = {}
+    for date in archived_dates():
+        if start_date and date < start_date:
+            continue
+        try:
+            with open(summary_path(date), 'r', encoding='utf-8') as f:
+                summaries[date] = json.load(f)
+        except Exception as e:
+            print(f"보관 요약 파일 읽기 오류 ({date}): {e}")
+    return summaries
+
+
+def iter_archived_logs(date):
+    with gzip.open(archive_path(date), 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def tail_logs(limit, source_filter=None, before_date=None):
+    # 최신 날짜부터 역순으로 최대 limit 개 (파일당 필요한 만큼만 메모리에 유지)
+    results = []
+    filtered = source_filter and source_filter != 'all'
+    summaries = read_summaries() if filtered else {}
+    for date in reversed(archived_dates()):
+        if before_date and date >= before_date:
+            continue
+        remaining = limit - len(results)
+        if remaining <= 0:
+            break
+        # 요약 파일에 해당 소스가 없는 날짜는 압축 해제 없이 건너뜀
+        summary = summaries.get(date)
+        if filtered and summary is not None and source_filter not in summary.get('sources', []):
+            continue
+        recent = deque(maxlen=remaining)
+        try:
+            for row in iter_archived_logs(date):
+                if source_filter and source_filter != 'all' and row.get('source') != source_filter:
+                    continue
+                recent.append(row)
+        except Exception as e:
+            print(f"보관 로그 읽기 오류 ({date}): {e}")
+            continue
+        results.extend(reversed(recent))
+    return results
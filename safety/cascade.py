@@ -0,0 +1,87 @@
+import numpy as np
+from .pose import PoseResult
+
+# 2단계 감지 (cascade)
+# - 1단계: 작은 사람 감지 모델(yolov8n)로 프레임 전체에서 사람 박스만 찾음
+# - 2단계: 구역(Yellow Zone 포함) 근처에 있는 사람 박스만 잘라서 큰 포즈 모델 실행
+# - 구역에서 먼 사람은 박스만 유지 (키포인트 신뢰도 0) -> 쓰러짐 판정/박스 표시는 그대로 동작
+
+PERSON_DETECTOR = 'yolov8n.pt'
+PERSON_CLASS = 0        # COCO 'person'
+APPROACH_MARGIN = 0.5   # 사람 박스 크기 대비 여유 (구역에 다가오는 사람도 포함)
+CROP_MARGIN = 0.1       # 포즈 추론용 crop 여백 (박스 크기 대비)
+MIN_MATCH_IOU = 0.3     # crop 안의 포즈 결과와 사람 박스를 같은 사람으로 볼 최소 IoU
+
+
+def box_iou(box, boxes):
+    # 박스 하나와 여러 박스의 IoU (xyxy)
+    x1 = np.maximum(box[0], boxes[:, 0])
+    y1 = np.maximum(box[1], boxes[:, 1])
+    x2 = np.minimum(box[2], boxes[:, 2])
+    y2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        iou = inter / (area + areas - inter)
+    return np.nan_to_num(iou)
+
+
+def zone_rects(zones):
+    # 구역별 바깥 경계(Yellow Zone, 없으면 Red Zone)의 사각형 (Z, 4)
+    rects = []
+    for zone in zones:
+        pts = zone['yellow_pts'] if zone['yellow_pts'] is not None else zone['red_pts']
+        pts = pts.reshape(-1, 2)
+        rects.append([pts[:, 0].min(), pts[:, 1].min(), pts[:, 0].max(), pts[:, 1].max()])
+    return np.array(rects, np.float32).reshape(-1, 4)
+
+
+def select_near_zones(boxes, rects, margin=APPROACH_MARGIN):
+    # 여유만큼 넓힌 사람 박스가 구역 사각형과 겹치면 포즈 추론 대상
+    if len(boxes) == 0 or len(rects) == 0:
+        return np.zeros(len(boxes), bool)
+    w = (boxes[:, 2] - boxes[:, 0]) * margin
+    h = (boxes[:, 3] - boxes[:, 1]) * margin
+    x1 = (boxes[:, 0] - w)[:, None]
+    y1 = (boxes[:, 1] - h)[:, None]
+    x2 = (boxes[:, 2] + w)[:, None]
+    y2 = (boxes[:, 3] + h)[:, None]
+    overlap = (x1 <= rects[None, :, 2]) & (x2 >= rects[None, :, 0]) & \
+              (y1 <= rects[None, :, 3]) & (y2 >= rects[None, :, 1])
+    return overlap.any(axis=1)
+
+
+def crop_boxes(boxes, width, height, margin=CROP_MARGIN):
+    # 여백을 포함한 crop 영역 (정수, 프레임 안으로 제한)
+    w = (boxes[:, 2] - boxes[:, 0]) * margin
+    h = (boxes[:, 3] - boxes[:, 1]) * margin
+    crops = np.stack([boxes[:, 0] - w, boxes[:, 1] - h, boxes[:, 2] + w, boxes[:, 3] + h], axis=1)
+    crops = np.floor(crops).astype(np.int32)
+    crops[:, [0, 2]] = np.clip(crops[:, [0, 2]], 0, width)
+    crops[:, [1, 3]] = np.clip(crops[:, [1, 3]], 0, height)
+    return crops
+
+
+def merge_crop_poses(boxes, scores, selected, crops, crop_poses):
+    # crop별 포즈 결과를 프레임 좌표로 되돌려서 사람 박스 순서대로 합침
+    n = len(boxes)
+    keypoints = np.zeros((n, 17, 3), np.float32)
+    out_boxes = boxes.astype(np.float32).copy()
+
+    for i, crop, pose in zip(np.flatnonzero(selected), crops, crop_poses):
+        if len(pose) == 0:
+            continue
+        offset = np.array([crop[0], crop[1], crop[0], crop[1]], np.float32)
+        pose_boxes = pose.boxes + offset
+        iou = box_iou(boxes[i], pose_boxes)
+        best = int(np.argmax(iou))
+        if iou[best] < MIN_MATCH_IOU:
+            continue
+        kpts = pose.keypoints[best].copy()
+        kpts[:, 0] += crop[0]
+        kpts[:, 1] += crop[1]
+        keypoints[i] = kpts
+        out_boxes[i] = pose_boxes[best]
+
+    return PoseResult(out_boxes, scores.astype(np.float32), keypoints)
@@ -0,0 +1,267 @@
+import os
+import json
+import time
+import threading
+import urllib.request
+import urllib.error
+import urllib.parse
+from . import database
+from .worker import WORKER_TOKEN, TOKEN_HEADER
+
+# 코디네이터 (SAFETY_ROLE=coordinator)
+# - config.json 의 모니터링 소스를 여러 워커(프로세스/호스트)에 나누어 배정
+# - 워커의 CPU 사용률(부하)을 보고 가장 한가한 워커에 배정, 부하 차이가 크면 소스 하나씩 이동
+# - 응답이 없는 워커의 소스는 남은 워커에 다시 배정
+# - 워커의 감지 로그를 주기적으로 가져와서 중앙 logs 테이블에 저장
+# - 워커의 /video_feed, /get_logs 는 코디네이터를 통해 그대로 전달
+
+WORKER_URLS = os.environ.get('SAFETY_WORKERS', '') # 예: http://127.0.0.1:5101,http://127.0.0.1:5102
+
+POLL_INTERVAL = 2.0         # 워커 상태 확인 / 로그 수집 주기 (초)
+DEAD_AFTER = 3              # 연속 실패 횟수 (넘으면 죽은 워커로 보고 재배정)
+DEFAULT_SOURCE_COST = 25.0  # 측정값이 없을 때 소스 1개의 예상 CPU 사용률 (%)
+REBALANCE_GAP = 50.0        # 워커 간 CPU 사용률 차이가 이보다 크면 소스 이동 (%)
+REBALANCE_COOLDOWN = 30.0   # 소스 이동 후 다음 이동까지 대기 (초, 측정값 안정화)
+EVENT_BATCH = 1000          # 한 번에 가져올 로그 수
+REQUEST_TIMEOUT = 5.0
+
+
+def parse_worker_urls(value):
+    return [url.strip().rstrip('/') for url in value.split(',') if url.strip()]
+
+
+def open_stream(url, timeout=10):
+    # 워커 스트림을 그대로 전달하기 위한 (응답 Content-Type, 청크 생성기)
+    resp = urllib.request.urlopen(url, timeout=timeout)
+
+    def chunks():
+        try:
+            while True:
+                chunk = resp.read1(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            resp.close()
+    return resp.headers.get('Content-Type'), chunks()
+
+
+def forward(url, headers=None, timeout=REQUEST_TIMEOUT):
+    # 단일 요청 전달 -> (상태 코드, 응답 헤더, 본문) (304/404 등도 그대로 반환)
+    req = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            return resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+
+class WorkerState:
+    def __init__(self, url):
+        self.url = url
+        self.alive = False
+        self.failures = 0
+        self.boot_id = None
+        self.event_cursor = 0   # 마지막으로 저장한 로그 순번
+        self.cpu = 0.0
+        self.cpu_count = None
+        self.ready = False
+        self.running = set()    # 워커가 보고한 실행 중 소스
+        self.last_seen = None
+
+    def info(self, assigned):
+        return {
+            'url': self.url,
+            'alive': self.alive,
+            'ready': self.ready,
+            'cpu': self.cpu,
+            'cpu_count': self.cpu_count,
+            'assigned': sorted(assigned),
+            'running': sorted(self.running),
+            'last_seen': self.last_seen
+        }
+
+
+class Coordinator:
+    def __init__(self, worker_urls, load_config):
+        self.workers = {url: WorkerState(url) for url in worker_urls}
+        self.load_config = load_config
+        self.assignments = {}  # 설정 키 -> 워커 URL
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.last_move = 0.0
+        self.thread = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        if not self.workers:
+            print("[코디네이터] 등록된 워커가 없습니다 (SAFETY_WORKERS)")
+        self.thread = threading.Thread(target=self._run, name='coordinator', daemon=True)
+        self.thread.start()
+        print(f"[코디네이터] 시작 (워커 {len(self.workers)}개)")
+
+    # ---- 외부 호출 ----
+    def worker_for(self, source_key):
+        # 소스를 처리 중인 살아 있는 워커 URL (없으면 None)
+        with self.lock:
+            url = self.assignments.get(source_key)
+            if url is not None and self.workers[url].alive:
+                return url
+        return None
+
+    def apply_config(self, source_key, config):
+        # 소스 설정이 저장되면 다음 주기를 기다리지 않고 바로 재배정/전달
+        self.wake.set()
+
+    def status(self):
+        with self.lock:
+            assigned = {url: [k for k, u in self.assignments.items() if u == url] for url in self.workers}
+            return {
+                'workers': [w.info(assigned[url]) for url, w in self.workers.items()],
+                'assignments': dict(self.assignments),
+                'unassigned': sorted(set(self.desired_sources()) - set(self.assignments))
+            }
+
+    # ---- 워커 통신 ----
+    def _request(self, url, path, body=None):
+        data = None
+        headers = {TOKEN_HEADER: WORKER_TOKEN} if WORKER_TOKEN else {}
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        req = urllib.request.Request(url + path, data=data, headers=headers)
+        with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+            return json.loads(resp.read().decode('utf-8'))
+
+    def _poll(self, worker):
+        try:
+            status = self._request(worker.url, '/worker/status')
+        except Exception as e:
+            worker.failures += 1
+            if worker.alive and worker.failures >= DEAD_AFTER:
+                worker.alive = False
+                print(f"[코디네이터] 워커 응답 없음: {worker.url} ({e})")
+            return
+
+        if not worker.alive:
+            print(f"[코디네이터] 워커 연결: {worker.url}")
+        if worker.boot_id is None:
+            # 코디네이터가 (재)시작됨 -> 워커가 저장 확인을 받은 순번부터 이어서 수집 (중복 저장 방지)
+            worker.boot_id = status.get('boot_id')
+            worker.event_cursor = status.get('event_acked', 0)
+        elif status.get('boot_id') != worker.boot_id:
+            # 워커가 재시작됨 -> 로그 순번 처음부터
+            worker.boot_id = status.get('boot_id')
+            worker.event_cursor = 0
+        worker.alive = True
+        worker.failures = 0
+        worker.cpu = status.get('cpu', 0.0)
+        worker.cpu_count = status.get('cpu_count')
+        worker.ready = status.get('ready', False)
+        worker.running = {s['source'] for s in status.get('sources', [])}
+        worker.last_seen = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def _collect_events(self, worker):
+        # 워커 로그를 중앙 DB에 저장 (저장에 성공한 경우에만 순번 이동 -> 중복/누락 방지)
+        # 다음 요청의 since 가 저장 확인 -> 빈 응답이 올 때까지 요청해서 마지막 묶음도 확인 전달
+        while True:
+            query = urllib.parse.urlencode({'since': worker.event_cursor, 'limit': EVENT_BATCH})
+            result = self._request(worker.url, f'/worker/events?{query}')
+            events = result.get('events', [])
+            if not events:
+                return
+            if not database.insert_logs(events):
+                return
+            worker.event_cursor = events[-1]['seq']
+
+    def _push(self, worker, config):
+        sources = {k: config.get(k, {}) for k, url in self.assignments.items() if url == worker.url}
+        try:
+            self._request(worker.url, '/worker/assign', {'sources': sources})
+            worker.running = set(sources)
+        except Exception as e:
+            print(f"[코디네이터] 소스 배정 전달 실패 ({worker.url}): {e}")
+
+    # ---- 배정 ----
+    def desired_sources(self, config=None):
+        # monitor: false 가 아닌 설정 소스
+        if config is None:
+            config = self.load_config()
+        return [k for k, cfg in config.items() if cfg.get('monitor', True) is not False]
+
+    def _source_cost(self, worker, count):
+        # 워커의 소스 1개당 CPU 사용률 (측정값이 없으면 기본값)
+        if count and worker.cpu > 0:
+            return worker.cpu / count
+        return DEFAULT_SOURCE_COST
+
+    def _assign(self, desired):
+        # 배정 갱신 -> 배정이 바뀐 워커 URL 집합
+        changed = set()
+        alive = [w for w in self.workers.values() if w.alive]
+
+        # 설정에서 빠졌거나 죽은 워커에 배정된 소스 회수
+        for source_key, url in list(self.assignments.items()):
+            if source_key not in desired or not self.workers[url].alive:
+                del self.assignments[source_key]
+                changed.add(url)
+        if not alive:
+            return changed
+
+        counts = {w.url: 0 for w in alive}
+        for url in self.assignments.values():
+            counts[url] += 1
+        load = {w.url: w.cpu for w in alive}
+
+        # 새 소스는 예상 부하가 가장 낮은 워커에
+        for source_key in desired:
+            if source_key in self.assignments:
+                continue
+            url = min(alive, key=lambda w: (load[w.url], counts[w.url])).url
+            worker = self.workers[url]
+            load[url] += self._source_cost(worker, counts[url])
+            counts[url] += 1
+            self.assignments[source_key] = url
+            changed.add(url)
+            print(f"[코디네이터] 소스 배정: {source_key} -> {url}")
+
+        # 부하 차이가 크면 가장 바쁜 워커에서 소스 하나를 가장 한가한 워커로 이동
+        if len(alive) > 1 and not changed and time.time() - self.last_move >= REBALANCE_COOLDOWN:
+            busiest = max(alive, key=lambda w: w.cpu)
+            idlest = min(alive, key=lambda w: w.cpu)
+            cost = self._source_cost(busiest, counts[busiest.url])
+            # 옮긴 뒤에도 순서가 뒤집히지 않을 때만 이동 (왕복 방지)
+            if busiest.cpu - idlest.cpu > max(REBALANCE_GAP, cost) and counts[busiest.url] > 1:
+                source_key = sorted(k for k, u in self.assignments.items() if u == busiest.url)[-1]
+                self.assignments[source_key] = idlest.url
+                changed.update({busiest.url, idlest.url})
+                self.last_move = time.time()
+                print(f"[코디네이터] 부하 분산: {source_key} {busiest.url} -> {idlest.url}")
+        return changed
+
+    def _run(self):
+        while True:
+            for worker in list(self.workers.values()):
+                self._poll(worker)
+
+            config = self.load_config()
+            desired = self.desired_sources(config)
+            with self.lock:
+                changed = self._assign(desired)
+                config_changed = self.wake.is_set()
+                self.wake.clear()
+
+            for worker in self.workers.values():
+                if not worker.alive or worker.failures:
+                    continue
+                assigned = {k for k, url in self.assignments.items() if url == worker.url}
+                # 배정이 바뀌었거나, 설정이 저장됐거나, 워커가 재시작되어 실행 목록이 다르면 다시 전달
+                if worker.url in changed or config_changed or worker.running != assigned:
+                    self._push(worker, config)
+                try:
+                    self._collect_events(worker)
+                except Exception as e:
+                    print(f"[코디네이터] 로그 수집 오류 ({worker.url}): {e}")
+
+            self.wake.wait(POLL_INTERVAL)
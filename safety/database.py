@@ -1,6 +1,8 @@
 import pymysql
 import os
+import json
 from datetime import datetime, timedelta
+from . import archive
 
 # MySQL 연결 설정
 DB_CONFIG = {
@@ -8,7 +10,7 @@ DB_CONFIG = {
     'port': 3306,
     'user': 'root',      
     'password': '12345', 
-    'database': 'AI_Project', 
+    'database': os.environ.get('SAFETY_DB_NAME', 'AI_Project'), # 부하 테스트 등에서 별도 DB 사용
     'charset': 'utf8mb4',
     'cursorclass': pymysql.cursors.DictCursor 
 }
@@ -48,6 +50,46 @@ def init_db():
                 PRIMARY KEY (id)
             )
         ''')
+
+        # [추가] 기간/소스 조회 및 보존 작업용 인덱스 (기존 테이블에도 추가)
+        c.execute('''
+            SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'logs'
+        ''', (DB_CONFIG['database'],))
+        existing = {row['INDEX_NAME'] for row in c.fetchall()}
+        if 'idx_logs_timestamp' not in existing:
+            c.execute("CREATE INDEX idx_logs_timestamp ON logs (timestamp)")
+        if 'idx_logs_source_timestamp' not in existing:
+            c.execute("CREATE INDEX idx_logs_source_timestamp ON logs (source, timestamp)")
+
+        # [추가] 구조화된 이벤트 정보 컬럼 (기존 테이블에도 추가, 이전 로그는 NULL)
+        c.execute('''
+            SELECT COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'logs'
+        ''', (DB_CONFIG['database'],))
+        columns = {row['COLUMN_NAME'] for row in c.fetchall()}
+        for name, definition in EVENT_COLUMNS:
+            if name not in columns:
+                c.execute(f"ALTER TABLE logs ADD COLUMN {name} {definition}")
+
+        # [추가] 업로드 영상 라이브러리 인덱스 (메타데이터 / 썸네일 캐시)
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS videos (
+                filename VARCHAR(255) NOT NULL,
+                size BIGINT NOT NULL,
+                mtime DOUBLE NOT NULL,
+                width INT,
+                height INT,
+                fps FLOAT,
+                frame_count INT,
+                duration FLOAT,
+                thumbnail VARCHAR(255),
+                status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                uploaded_at VARCHAR(255) NOT NULL,
+                PRIMARY KEY (filename),
+                KEY idx_videos_uploaded (uploaded_at)
+            )
+        ''')
         
         conn.commit()
         conn.close()
@@ -55,20 +97,62 @@ def init_db():
     except Exception as e:
         print(f"DB 초기화 오류: {e}")
 
-def insert_log(level, message, source='unknown'):
+# [추가] 감지 이벤트의 구조화된 정보 (detector.add_log 의 event 딕셔너리 키 = 컬럼 이름)
+# - zone_id: 구역 id, rule_type: fall / touch / intrusion / approach / rule:<규칙 이름>
+# - pos_x / pos_y: 화면 내 위치 (0~1 비율)
+# - keypoints: 판정에 쓰인 키포인트 [[번호, x, y, conf], ...] (JSON)
+EVENT_COLUMNS = [
+    ('zone_id', 'VARCHAR(255)'),
+    ('rule_type', 'VARCHAR(100)'),
+    ('pos_x', 'FLOAT'),
+    ('pos_y', 'FLOAT'),
+    ('keypoints', 'TEXT')
+]
+LOG_INSERT = ("INSERT INTO logs (timestamp, level, message, source, zone_id, rule_type, pos_x, pos_y, keypoints) "
+              "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)")
+
+def event_values(event):
+    event = event or {}
+    keypoints = event.get('keypoints')
+    return (event.get('zone_id'), event.get('rule_type'),
+            event.get('pos_x'), event.get('pos_y'),
+            json.dumps(keypoints) if keypoints is not None else None)
+
+# [추가] 워커 모드에서는 로그를 DB 대신 코디네이터 전달용 큐에 쌓음 (worker.py 에서 설정)
+log_forwarder = None
+
+def insert_log(level, message, source='unknown', event=None):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if log_forwarder is not None:
+        log_forwarder(timestamp, level, message, source, event)
+        return
     try:
         conn = get_connection()
         c = conn.cursor()
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        c.execute("INSERT INTO logs (timestamp, level, message, source) VALUES (%s, %s, %s, %s)",
-                  (timestamp, level, message, source))
+        c.execute(LOG_INSERT, (timestamp, level, message, source) + event_values(event))
         
         conn.commit()
         conn.close()
     except Exception as e:
         print(f"DB 저장 오류: {e}")
 
+# [추가] 워커에서 모아 온 로그를 한 번에 저장 (발생 시각 유지)
+def insert_logs(rows):
+    if not rows:
+        return True
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany(LOG_INSERT, [(r['timestamp'], r['level'], r['message'], r['source']) + event_values(r.get('event'))
+                                   for r in rows])
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"DB 저장 오류: {e}")
+        return False
+
 # [수정] 로그 조회 (필터링 추가)
 def get_all_logs(limit=100, source_filter=None):
     try:
@@ -86,9 +170,13 @@ def get_all_logs(limit=100, source_filter=None):
         params.append(limit)
         
         c.execute(query, tuple(params))
-        rows = c.fetchall()
+        rows = list(c.fetchall())
         
         conn.close()
+
+        # [추가] hot 테이블에 부족하면 보관 파일에서 이어서 조회
+        if len(rows) < limit:
+            rows.extend(archive.tail_logs(limit - len(rows), source_filter))
         return rows 
     except Exception as e:
         print(f"로그 조회 오류: {e}")
@@ -119,12 +207,26 @@ def get_stats_by_date(days=7, source_filter=None):
         c.execute(query, tuple(params))
         rows = c.fetchall()
         conn.close()
+
+        counts = {row['date']: row['count'] for row in rows}
+
+        # [추가] 보관된 날짜는 요약 파일로 집계 (압축 해제 없음)
+        for date, summary in archive.read_summaries(start_date).items():
+            by_source = summary['danger_by_source']
+            if source_filter and source_filter != 'all':
+                count = by_source.get(source_filter, 0)
+            else:
+                count = sum(by_source.values())
+            if count:
+                counts[date] = count
+            else:
+                counts.pop(date, None)
         
         labels = []
         data = []
-        for row in reversed(rows): 
-            labels.append(row['date'])
-            data.append(row['count'])
+        for date in sorted(counts): 
+            labels.append(date)
+            data.append(counts[date])
             
         return {'labels': labels, 'data': data}
     except Exception as e:
@@ -140,20 +242,32 @@ def get_stats_by_source(days=7):
         start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
         
         c.execute('''
-            SELECT source, count(*) as count
+            SELECT SUBSTRING(timestamp, 1, 10) as date, source, count(*) as count
             FROM logs 
             WHERE level = 'danger' AND timestamp >= %s
-            GROUP BY source
-            ORDER BY count DESC
+            GROUP BY date, source
         ''', (start_date,))
         rows = c.fetchall()
         conn.close()
+
+        # [수정] 보관된 날짜는 요약 파일 값만 사용 (보관 후 아직 삭제 전인 행과 중복 집계 방지)
+        summaries = archive.read_summaries(start_date)
+        counts = {}
+        for row in rows:
+            if row['date'] in summaries:
+                continue
+            source = row['source'] if row['source'] else 'Unknown'
+            counts[source] = counts.get(source, 0) + row['count']
+
+        for summary in summaries.values():
+            for source, count in summary['danger_by_source'].items():
+                counts[source] = counts.get(source, 0) + count
         
         labels = []
         data = []
-        for row in rows:
-            labels.append(row['source'] if row['source'] else 'Unknown')
-            data.append(row['count'])
+        for source, count in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+            labels.append(source)
+            data.append(count)
             
         return {'labels': labels, 'data': data}
     except Exception as e:
@@ -167,6 +281,88 @@ def get_source_list():
         c.execute("SELECT DISTINCT source FROM logs ORDER BY source")
         rows = c.fetchall()
         conn.close()
-        return [row['source'] for row in rows if row['source']]
+        sources = {row['source'] for row in rows if row['source']}
+        for summary in archive.read_summaries().values():
+            sources.update(s for s in summary['sources'] if s != 'Unknown')
+        return sorted(sources)
     except Exception as e:
         return []
+
+# [추가] 영상 라이브러리 등록 (파일이 바뀐 경우 메타데이터 재분석 대기 상태로)
+def upsert_video(filename, size, mtime):
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        uploaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        c.execute('''
+            INSERT INTO videos (filename, size, mtime, status, uploaded_at)
+            VALUES (%s, %s, %s, 'pending', %s)
+            ON DUPLICATE KEY UPDATE size = VALUES(size), mtime = VALUES(mtime), status = 'pending'
+        ''', (filename, size, mtime, uploaded_at))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception as e:
+        print(f"영상 등록 오류: {e}")
+        return False
+
+def update_video_metadata(filename, meta, status='ready'):
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute('''
+            UPDATE videos
+            SET width = %s, height = %s, fps = %s, frame_count = %s, duration = %s,
+                thumbnail = %s, status = %s
+            WHERE filename = %s
+        ''', (meta.get('width'), meta.get('height'), meta.get('fps'), meta.get('frame_count'),
+              meta.get('duration'), meta.get('thumbnail'), status, filename))
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"영상 메타데이터 저장 오류: {e}")
+
+def delete_videos(filenames):
+    if not filenames:
+        return
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.executemany("DELETE FROM videos WHERE filename = %s", [(f,) for f in filenames])
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print(f"영상 삭제 오류: {e}")
+
+# 인덱스 전체 (파일명 -> 크기/수정시간/상태), DB 오류 시 None
+def get_video_index():
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute("SELECT filename, size, mtime, status FROM videos")
+        rows = c.fetchall()
+        conn.close()
+        return {row['filename']: row for row in rows}
+    except Exception as e:
+        print(f"영상 인덱스 조회 오류: {e}")
+        return None
+
+# 영상 목록 페이지 조회 -> (목록, 전체 개수), DB 오류 시 (None, 0)
+def get_video_page(page=1, per_page=50):
+    try:
+        conn = get_connection()
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) AS total FROM videos")
+        total = c.fetchone()['total']
+        c.execute('''
+            SELECT filename, size, width, height, fps, frame_count, duration, thumbnail, status, uploaded_at
+            FROM videos
+            ORDER BY uploaded_at DESC, filename
+            LIMIT %s OFFSET %s
+        ''', (per_page, (page - 1) * per_page))
+        rows = c.fetchall()
+        conn.close()
+        return rows, total
+    except Exception as e:
+        print(f"영상 목록 조회 오류: {e}")
+        return None, 0
@@ -2,27 +2,24 @@ import cv2
 import numpy as np
 import math
 import time
+import threading
 from datetime import datetime
 from . import database # DB 모듈 임포트
+from .pose import as_pose_result
+from .rules import compile_rules, evaluate_rules, joint_angles, points_in_polygon, RuleContext
+from .detector_config import DetectorConfig, parse_zones, expand_polygon
+from . import render
+from .heatmap import heatmaps
+
+# 구역 종류별 검사 키포인트 (touch: 양 손목, intrusion: 전체)
+TOUCH_INDICES = np.array([9, 10])
+ALL_INDICES = np.arange(17)
 
 class SafetyDetector:
     def __init__(self):
-        # 설정값 초기화
-        self.zones = []
-        self.expand_ratio = 0.0
-        self.canvas_size = None 
-        
-        # 감지 설정
-        self.conf = 0.5
-        self.height_limit = 0
-        self.elbow_angle = 0
-        self.reach_enabled = False
-        self.fall_enabled = False
-        
-        # 화면 표시 설정
-        self.draw_objects = True 
-        self.draw_zones = True 
-        self.show_only_alert = False 
+        # [수정] 모든 설정은 불변 스냅샷 하나로 관리 (변경 시 참조만 교체)
+        self.config = DetectorConfig()
+        self._update_lock = threading.Lock() # 설정 변경끼리만 직렬화 (프레임 처리에는 락 없음)
         
         # 로그 관리
         self.logs = [] 
@@ -50,22 +47,48 @@ class SafetyDetector:
         self.box_color_warning = (0, 255, 255) 
         self.box_color_danger = (0, 0, 255) 
 
+        # [추가] 구역 외곽선 등 정적 그림 캐시 (설정 스냅샷 버전 + 프레임 크기별)
+        self.overlays = render.OverlayCache(maxsize=16)
+
+        # [추가] 히트맵은 새 추론 결과일 때만 누적 (건너뛴 프레임에서 같은 결과 재사용 시 중복 방지)
+        self._last_result = None
+
+    # 현재 스냅샷에서 일부 값만 바꾼 새 스냅샷을 만들어 한 번에 교체
+    def update(self, **changes):
+        with self._update_lock:
+            self.config = self.config.replace(**changes)
+
+    def set_config(self, config):
+        with self._update_lock:
+            self.config = config
+
     def update_config(self, conf, height_limit, elbow_angle, reach_enabled, fall_enabled):
-        self.conf = float(conf)
-        self.height_limit = int(height_limit)
-        self.elbow_angle = int(elbow_angle)
-        self.reach_enabled = bool(reach_enabled)
-        self.fall_enabled = bool(fall_enabled)
+        self.update(conf=float(conf),
+                    height_limit=int(height_limit),
+                    elbow_angle=int(elbow_angle),
+                    reach_enabled=bool(reach_enabled),
+                    fall_enabled=bool(fall_enabled))
+
+    def update_conf(self, conf):
+        self.update(conf=float(conf))
+
+    def update_rules(self, rules):
+        # config.json의 규칙 정의를 한 번만 컴파일
+        self.update(rules=tuple(compile_rules(rules)))
 
     def update_display_config(self, draw_objects, draw_zones, show_only_alert):
-        self.draw_objects = bool(draw_objects)
-        self.draw_zones = bool(draw_zones)
-        self.show_only_alert = bool(show_only_alert)
+        self.update(draw_objects=bool(draw_objects),
+                    draw_zones=bool(draw_zones),
+                    show_only_alert=bool(show_only_alert))
 
     def update_zones(self, zones, expand_ratio, canvas_size):
-        self.zones = zones
-        self.expand_ratio = float(expand_ratio)
-        self.canvas_size = canvas_size
+        self.update(zones=parse_zones(zones),
+                    expand_ratio=float(expand_ratio or 0),
+                    canvas_size=tuple(canvas_size) if canvas_size else None)
+
+    # [추가] config.json의 소스 설정 전체를 스냅샷 하나로 만들어 적용 (없으면 기본값)
+    def apply_source_config(self, source_config):
+        self.set_config(DetectorConfig.from_source_config(source_config))
         
     # [추가] 소스 정보 업데이트
     def set_source(self, source):
@@ -78,17 +101,10 @@ class SafetyDetector:
         return angle
 
     def get_expanded_zone(self, pts, ratio):
-        if ratio <= 0: return None
-        cx = np.mean(pts[:, 0])
-        cy = np.mean(pts[:, 1])
-        expanded_pts = []
-        for p in pts:
-            nx = cx + (p[0] - cx) * (1 + ratio)
-            ny = cy + (p[1] - cy) * (1 + ratio)
-            expanded_pts.append([nx, ny])
-        return np.array(expanded_pts, np.int32).reshape((-1, 1, 2))
-
-    def add_log(self, level, message):
+        return expand_polygon(pts, ratio)
+
+    # [수정] event: 구역 id / 규칙 종류 / 위치 / 키포인트 등 구조화된 정보 (make_event)
+    def add_log(self, level, message, event=None):
         current_time = time.time()
         if current_time - self.last_log_time < 1.0:
             return
@@ -99,7 +115,8 @@ class SafetyDetector:
         log_entry = {
             'time': timestamp,
             'level': level, 
-            'message': message
+            'message': message,
+            'event': event
         }
         self.logs.insert(0, log_entry) 
         if len(self.logs) > 50: 
@@ -108,11 +125,25 @@ class SafetyDetector:
         self.last_log_time = current_time
         
         # [추가] DB 저장
-        database.insert_log(level, message, self.current_source)
+        database.insert_log(level, message, self.current_source, event)
 
     def get_logs(self):
         return self.logs
 
+    # [추가] 감지 이벤트 정보 (위치는 프레임 크기 대비 0~1 비율, keypoints 는 [[번호, x, y, conf], ...])
+    def make_event(self, rule_type, pos, width, height, kpts=None, indices=None, zone_id=None):
+        keypoints = None
+        if kpts is not None:
+            keypoints = [[int(k), round(float(kpts[k][0]), 1), round(float(kpts[k][1]), 1), round(float(kpts[k][2]), 3)]
+                         for k in indices]
+        return {
+            'zone_id': str(zone_id) if zone_id is not None else None,
+            'rule_type': rule_type,
+            'pos_x': round(min(max(float(pos[0]) / width, 0.0), 1.0), 4),
+            'pos_y': round(min(max(float(pos[1]) / height, 0.0), 1.0), 4),
+            'keypoints': keypoints
+        }
+
     # 스켈레톤 그리기
     def draw_skeleton(self, frame, kpts, kpts_status):
         for p1, p2 in self.skeleton_links:
@@ -144,26 +175,34 @@ class SafetyDetector:
             cv2.putText(frame, label, (int(box[0]), int(box[1]) - 10), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
+    # 구역 외곽선 (Red Zone + 확장된 Yellow Zone)
+    def draw_zones(self, frame, processed_zones):
+        for zone in processed_zones:
+            cv2.polylines(frame, [zone['red_pts']], True, (0, 0, 255), 2)
+            if zone['yellow_pts'] is not None:
+                cv2.polylines(frame, [zone['yellow_pts']], True, (0, 255, 255), 2)
+
     # 최종 그리기 로직
-    def draw_results(self, frame, result, processed_zones, people_draw_data, is_alert):
+    def draw_results(self, frame, cfg, processed_zones, people_draw_data, is_alert):
         should_draw = True
-        if self.show_only_alert and not is_alert:
+        if cfg.show_only_alert and not is_alert:
             should_draw = False
-        if not self.draw_objects and not self.draw_zones: 
+        if not cfg.draw_objects and not cfg.draw_zones: 
             should_draw = False
 
         if not should_draw:
             return frame
 
-        if self.draw_zones or is_alert:
-            for zone in processed_zones:
-                cv2.polylines(frame, [zone['red_pts']], True, (0, 0, 255), 2)
-                if zone['yellow_pts'] is not None:
-                    cv2.polylines(frame, [zone['yellow_pts']], True, (0, 255, 255), 2)
+        h, w = frame.shape[:2]
+        if cfg.draw_zones or is_alert:
+            # [최적화] 구역 외곽선은 설정이 바뀔 때만 다시 그리고 프레임에는 합성만 수행
+            zones = self.overlays.get(('zones', cfg.version, h, w), lambda: render.Overlay.render(
+                h, w, lambda img, offset: self.draw_zones(img, processed_zones)))
+            zones.apply(frame)
 
-        if self.draw_objects:
+        if cfg.draw_objects:
             for person in people_draw_data:
-                if self.show_only_alert and not person['is_alert']:
+                if cfg.show_only_alert and not person['is_alert']:
                     continue
                 
                 box_color = self.box_color_normal
@@ -184,150 +223,190 @@ class SafetyDetector:
                         cv2.line(frame, item['p1'], item['p2'], (0, 255, 255), 2)
                     elif item['type'] == 'text':
                         cv2.putText(frame, item['msg'], item['pos'], cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                    elif item['type'] == 'rule':
+                        color = (0, 0, 255) if item['level'] == 'danger' else (0, 255, 255)
+                        cv2.putText(frame, item['msg'], item['pos'], cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
                     elif item['type'] == 'zone_alert':
                         color = (0, 0, 255) if item['level'] == 'danger' else (0, 255, 255)
                         thick = 5 if item['level'] == 'danger' else 4
                         pts = item['zone']['red_pts'] if item['level'] == 'danger' else item['zone']['yellow_pts']
                         
-                        cv2.polylines(frame, [pts], True, color, thick)
-                        cv2.putText(frame, item['msg'], (50, 100 if item['level']=='danger' else 150), cv2.FONT_HERSHEY_SIMPLEX, 1.2, color, 2)
+                        # 경고 외곽선/문구도 위치가 고정이므로 캐시된 그림을 합성
+                        render.draw_polylines(frame, self.overlays, ('alert', cfg.version, id(pts), thick),
+                                              [pts], color, thick)
+                        render.draw_text(frame, item['msg'], (50, 100 if item['level']=='danger' else 150), 1.2, color, 2)
         
         return frame
 
-    def process_frame(self, frame, result):
-        if result.keypoints is None:
-            return frame
-
-        scale_x = 1.0
-        scale_y = 1.0
-        if self.canvas_size:
-            h, w = frame.shape[:2]
-            scale_x = w / self.canvas_size[0]
-            scale_y = h / self.canvas_size[1]
-
-        processed_zones = []
-        for zone in self.zones:
-            red_pts = []
-            for p in zone['points']:
-                red_pts.append([int(p['x'] * scale_x), int(p['y'] * scale_y)])
-            red_pts = np.array(red_pts, np.int32).reshape((-1, 1, 2))
-            
-            yellow_pts = self.get_expanded_zone(red_pts.reshape(-1, 2), self.expand_ratio)
-            
-            processed_zones.append({
-                'type': zone.get('type', 'touch'),
-                'red_pts': red_pts,
-                'yellow_pts': yellow_pts
-            })
-
-        boxes = result.boxes
-        keypoints = result.keypoints.data
+    def process_frame(self, frame, result, draw=True, config=None):
+        # YOLO 결과 / PoseResult 모두 numpy 배열 형식으로 통일
+        # draw=False 이면 판정/로그만 수행하고 그리기는 생략 (백그라운드 모니터링)
+        pose = as_pose_result(result)
+
+        # [수정] 프레임마다 설정 스냅샷을 한 번만 읽음 (도중에 설정이 바뀌어도 영향 없음)
+        cfg = config if config is not None else self.config
+
+        h, w = frame.shape[:2]
+        processed_zones = cfg.scaled_zones(w, h)
+
+        # [추가] 새 추론 결과인지 (같은 결과를 다시 그리는 프레임은 히트맵에 누적하지 않음)
+        new_result = result is not self._last_result
+        self._last_result = result
+
+        boxes = pose.boxes
+        keypoints = pose.keypoints
+        n = len(keypoints)
+        has_box = len(boxes) == n
+
+        # [최적화] 사람별 반복문 대신 모든 사람의 판정을 배열 연산으로 한 번에 계산
+        vis = keypoints[:, :, 2] >= 0.1
+        vis_conf = keypoints[:, :, 2] >= cfg.conf
+
+        # 쓰러짐 (가로 > 세로 * 1.2)
+        fall = np.zeros(n, bool)
+        if cfg.fall_enabled and has_box:
+            fall = (boxes[:, 2] - boxes[:, 0]) > (boxes[:, 3] - boxes[:, 1]) * 1.2
+
+        # 손 높이 상한선 (어깨-골반 길이 기준)
+        shoulder_vis = vis[:, [5, 6]]
+        hip_vis = vis[:, [11, 12]]
+        torso_ok = shoulder_vis.any(axis=1) & hip_vis.any(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_shoulder_y = np.sum(keypoints[:, [5, 6], 1] * shoulder_vis, axis=1) / np.sum(shoulder_vis, axis=1)
+            avg_hip_y = np.sum(keypoints[:, [11, 12], 1] * hip_vis, axis=1) / np.sum(hip_vis, axis=1)
+            torso_len = avg_hip_y - avg_shoulder_y
+            limit_y = avg_hip_y - (torso_len * (cfg.height_limit / 100.0))
+            height_pass = torso_ok & (
+                (vis_conf[:, 9] & (keypoints[:, 9, 1] < limit_y)) |
+                (vis_conf[:, 10] & (keypoints[:, 10, 1] < limit_y)))
+        center_x = np.mean(keypoints[:, [5, 6, 11, 12], 0], axis=1)
+
+        # 팔꿈치 각도 (어깨-팔꿈치-손목)
+        left_vis = vis[:, 5] & vis[:, 7] & vis[:, 9]
+        right_vis = vis[:, 6] & vis[:, 8] & vis[:, 10]
+        left_angle = joint_angles(keypoints, 5, 7, 9)
+        right_angle = joint_angles(keypoints, 6, 8, 10)
+        angle_pass = (left_vis & (left_angle >= cfg.elbow_angle)) | \
+                     (right_vis & (right_angle >= cfg.elbow_angle))
+
+        is_reaching = np.ones(n, bool)
+        if cfg.reach_enabled:
+            if cfg.height_limit > 0:
+                is_reaching &= height_pass
+            if cfg.elbow_angle > 0:
+                is_reaching &= angle_pass
+
+        # 구역 침범 (touch: 손목, intrusion: 전체 키포인트)
+        zone_hits = []
+        for zone in processed_zones:
+            check_indices = TOUCH_INDICES if zone['type'] == 'touch' else ALL_INDICES
+            pts = keypoints[:, check_indices, :2].astype(np.int32).reshape(-1, 2)
+            valid = vis_conf[:, check_indices] & is_reaching[:, None]
+
+            red = points_in_polygon(pts, zone['red_pts'].reshape(-1, 2)).reshape(n, len(check_indices)) & valid
+            yellow = np.zeros_like(red)
+            if zone['yellow_pts'] is not None:
+                yellow = points_in_polygon(pts, zone['yellow_pts'].reshape(-1, 2)).reshape(n, len(check_indices)) & valid & ~red
+            zone_hits.append((zone, check_indices, red, yellow))
+
+        # 소스별 선언형 규칙 (config.json 'rules')
+        rule_hits = []
+        if cfg.rules and n:
+            ctx = RuleContext(keypoints, boxes, processed_zones, cfg.conf)
+            rule_hits = evaluate_rules(cfg.rules, ctx)
 
         is_alert = False
         people_draw_data = []
+        heat_points = {'danger': [], 'warning': []} # 등급별 감지 위치 (히트맵)
 
-        for i, kpts in enumerate(keypoints):
-            kpts_cpu = kpts.cpu().numpy()
+        for i in range(n):
+            kpts_cpu = keypoints[i]
+            box = boxes[i] if has_box else None
             person_alert = False 
             person_draw_items = [] 
-            kpts_status = [0] * 17 
-            
-            if self.fall_enabled and boxes is not None and len(boxes) > i:
-                box = boxes[i].xyxy[0].cpu().numpy()
-                w = box[2] - box[0]
-                h = box[3] - box[1]
-                if w > h * 1.2:
-                    person_alert = True
-                    is_alert = True
-                    self.add_log('danger', "쓰러짐 감지 (Fall Detected)")
-                    person_draw_items.append({'type': 'fall', 'box': box, 'level': 'danger'})
-
-            shoulders_y = [kpts_cpu[i][1] for i in [5, 6] if kpts_cpu[i][2] >= 0.1]
-            hips_y = [kpts_cpu[i][1] for i in [11, 12] if kpts_cpu[i][2] >= 0.1]
-
-            height_pass = False
-            limit_y = 0
-            center_x = 0
-            width = 0
-            
-            if shoulders_y and hips_y:
-                avg_shoulder_y = sum(shoulders_y) / len(shoulders_y)
-                avg_hip_y = sum(hips_y) / len(hips_y)
-                torso_len = avg_hip_y - avg_shoulder_y
-                limit_y = avg_hip_y - (torso_len * (self.height_limit / 100.0))
-                center_x = int((kpts_cpu[5][0] + kpts_cpu[6][0] + kpts_cpu[11][0] + kpts_cpu[12][0]) / 4)
-                width = int(torso_len * 0.8)
-
-                if (kpts_cpu[9][2] >= self.conf and kpts_cpu[9][1] < limit_y) or \
-                   (kpts_cpu[10][2] >= self.conf and kpts_cpu[10][1] < limit_y):
-                    height_pass = True
-                
-                if self.height_limit > 0:
-                    person_draw_items.append({'type': 'line', 'p1': (center_x - width, int(limit_y)), 'p2': (center_x + width, int(limit_y))})
-
-            angle_pass = False
-            if kpts_cpu[5][2] >= 0.1 and kpts_cpu[7][2] >= 0.1 and kpts_cpu[9][2] >= 0.1:
-                angle = self.calculate_angle(kpts_cpu[5][:2], kpts_cpu[7][:2], kpts_cpu[9][:2])
-                person_draw_items.append({'type': 'text', 'msg': f"{int(angle)}", 'pos': (int(kpts_cpu[7][0]), int(kpts_cpu[7][1]) - 10)})
-                if angle >= self.elbow_angle: angle_pass = True
+            kpts_status = np.zeros(17, np.int32)
+
+            # 사람 위치: 박스 아래쪽 가운데 (발 위치), 박스가 없으면 보이는 키포인트 평균
+            visible = np.nonzero(vis_conf[i])[0]
+            if box is not None:
+                person_pos = ((box[0] + box[2]) / 2, box[3])
+            elif len(visible):
+                person_pos = tuple(kpts_cpu[visible, :2].mean(axis=0))
+            else:
+                person_pos = tuple(kpts_cpu[:, :2].mean(axis=0))
             
-            if kpts_cpu[6][2] >= 0.1 and kpts_cpu[8][2] >= 0.1 and kpts_cpu[10][2] >= 0.1:
-                angle = self.calculate_angle(kpts_cpu[6][:2], kpts_cpu[8][:2], kpts_cpu[10][:2])
-                person_draw_items.append({'type': 'text', 'msg': f"{int(angle)}", 'pos': (int(kpts_cpu[8][0]), int(kpts_cpu[8][1]) - 10)})
-                if angle >= self.elbow_angle: angle_pass = True
-
-            is_reaching = True
-            if self.reach_enabled:
-                cond_h = height_pass if self.height_limit > 0 else True
-                cond_a = angle_pass if self.elbow_angle > 0 else True
-                if not (cond_h and cond_a):
-                    is_reaching = False
-
-            for zone in processed_zones:
-                check_indices = []
-                if zone['type'] == 'touch':
-                    check_indices = [9, 10] 
-                else:
-                    check_indices = range(17) 
-
-                if not is_reaching:
-                    continue
-
-                red_intrusion = False
-                yellow_intrusion = False
-
-                for idx in check_indices:
-                    if kpts_cpu[idx][2] < self.conf: continue
-                    
-                    pt = (int(kpts_cpu[idx][0]), int(kpts_cpu[idx][1]))
-                    
-                    if cv2.pointPolygonTest(zone['red_pts'], pt, False) >= 0:
-                        red_intrusion = True
-                        kpts_status[idx] = max(kpts_status[idx], 2) 
-                    
-                    elif zone['yellow_pts'] is not None:
-                        if cv2.pointPolygonTest(zone['yellow_pts'], pt, False) >= 0:
-                            yellow_intrusion = True
-                            kpts_status[idx] = max(kpts_status[idx], 1) 
-
-                if red_intrusion:
+            if fall[i]:
+                person_alert = True
+                is_alert = True
+                event = self.make_event('fall', person_pos, w, h, kpts_cpu, visible)
+                heat_points['danger'].append(person_pos)
+                self.add_log('danger', "쓰러짐 감지 (Fall Detected)", event)
+                person_draw_items.append({'type': 'fall', 'box': box, 'level': 'danger'})
+
+            if torso_ok[i] and cfg.height_limit > 0:
+                cx = int(center_x[i])
+                width = int(torso_len[i] * 0.8)
+                person_draw_items.append({'type': 'line', 'p1': (cx - width, int(limit_y[i])), 'p2': (cx + width, int(limit_y[i]))})
+
+            if left_vis[i]:
+                person_draw_items.append({'type': 'text', 'msg': f"{int(left_angle[i])}", 'pos': (int(kpts_cpu[7][0]), int(kpts_cpu[7][1]) - 10)})
+            if right_vis[i]:
+                person_draw_items.append({'type': 'text', 'msg': f"{int(right_angle[i])}", 'pos': (int(kpts_cpu[8][0]), int(kpts_cpu[8][1]) - 10)})
+
+            for zone, check_indices, red, yellow in zone_hits:
+                kpts_status[check_indices] = np.maximum(kpts_status[check_indices],
+                                                        np.where(red[i], 2, np.where(yellow[i], 1, 0)))
+
+                if red[i].any():
                     person_alert = True
                     is_alert = True
                     msg = "DANGER: TOUCH!" if zone['type'] == 'touch' else "DANGER: INTRUSION!"
-                    self.add_log('danger', f"Zone 침범 감지 ({msg})")
+                    # 구역 안에 들어간 키포인트 위치 기준
+                    hit = check_indices[red[i]]
+                    pos = tuple(kpts_cpu[hit, :2].mean(axis=0))
+                    event = self.make_event(zone['type'], pos, w, h, kpts_cpu, hit, zone['id'])
+                    heat_points['danger'].append(pos)
+                    self.add_log('danger', f"Zone 침범 감지 ({msg})", event)
                     person_draw_items.append({'type': 'zone_alert', 'zone': zone, 'level': 'danger', 'msg': msg})
-                elif yellow_intrusion:
+                elif yellow[i].any():
                     person_alert = True
                     is_alert = True
-                    self.add_log('warning', "접근 경고 (Approaching)")
+                    hit = check_indices[yellow[i]]
+                    pos = tuple(kpts_cpu[hit, :2].mean(axis=0))
+                    event = self.make_event('approach', pos, w, h, kpts_cpu, hit, zone['id'])
+                    heat_points['warning'].append(pos)
+                    self.add_log('warning', "접근 경고 (Approaching)", event)
                     person_draw_items.append({'type': 'zone_alert', 'zone': zone, 'level': 'warning', 'msg': "WARNING: APPROACHING"})
+
+            for rule, mask in rule_hits:
+                if not mask[i]:
+                    continue
+                person_alert = True
+                is_alert = True
+                event = self.make_event(f"rule:{rule.name}", person_pos, w, h, kpts_cpu, visible)
+                heat_points['danger' if rule.level == 'danger' else 'warning'].append(person_pos)
+                self.add_log(rule.level, rule.message, event)
+                if box is not None:
+                    pos = (int(box[0]), int(box[3]) + 20)
+                else:
+                    pos = (int(kpts_cpu[0][0]), int(kpts_cpu[0][1]))
+                person_draw_items.append({'type': 'rule', 'level': rule.level, 'msg': rule.name, 'pos': pos})
             
             people_draw_data.append({
                 'is_alert': person_alert,
                 'items': person_draw_items,
-                'box': boxes[i].xyxy[0].cpu().numpy() if boxes is not None and len(boxes) > i else None,
+                'box': box,
                 'kpts': kpts_cpu,
                 'kpts_status': kpts_status
             })
 
-        return self.draw_results(frame, result, processed_zones, people_draw_data, is_alert)
+        # [추가] 소스별 히트맵에 감지 위치 누적 (비율 좌표)
+        if new_result:
+            for level, points in heat_points.items():
+                if points:
+                    pts = np.array(points, np.float64)
+                    heatmaps.record(self.current_source, level, pts[:, 0] / w, pts[:, 1] / h)
+
+        if not draw:
+            return frame
+        return self.draw_results(frame, cfg, processed_zones, people_draw_data, is_alert)
@@ -0,0 +1,115 @@
+import itertools
+import threading
+from dataclasses import dataclass, field, replace
+import numpy as np
+from .rules import compile_rules
+
+# 감지기 설정 스냅샷
+# - 모든 설정값(구역, 임계값, 표시 옵션, 컴파일된 규칙)을 하나의 불변 객체로 묶음
+# - 변경 시에는 새 스냅샷을 만들어 참조 하나만 교체 -> 프레임 처리 중에는 락 없이
+#   스냅샷을 한 번 읽어서 사용하고, 반쯤 적용된 설정을 보지 않음
+
+_versions = itertools.count(1)
+
+
+def parse_zones(zones):
+    # 구역 정의(dict) -> 원본 좌표 배열 (읽기 전용)
+    parsed = []
+    for zone in zones or []:
+        points = np.array([[p['x'], p['y']] for p in zone['points']], np.float64)
+        points.setflags(write=False)
+        parsed.append({
+            'id': zone.get('id'),
+            'type': zone.get('type', 'touch'),
+            'points': points
+        })
+    return tuple(parsed)
+
+
+def expand_polygon(pts, ratio):
+    # 중심 기준으로 (1 + ratio) 배 확장한 Yellow Zone
+    if ratio <= 0:
+        return None
+    center = pts.mean(axis=0)
+    expanded = center + (pts - center) * (1 + ratio)
+    return expanded.astype(np.int32).reshape((-1, 1, 2))
+
+
+@dataclass(frozen=True)
+class DetectorConfig:
+    # 구역 설정
+    zones: tuple = ()
+    expand_ratio: float = 0.0
+    canvas_size: tuple = None
+
+    # 감지 설정
+    conf: float = 0.5
+    height_limit: int = 0
+    elbow_angle: int = 0
+    reach_enabled: bool = False
+    fall_enabled: bool = False
+    rules: tuple = ()  # 컴파일된 선언형 규칙
+    imgsz: int = None  # 추론 입력 크기 (None이면 모델 기본값)
+
+    # 화면 표시 설정
+    draw_objects: bool = True
+    draw_zones: bool = True
+    show_only_alert: bool = False
+
+    version: int = field(default=0, compare=False)
+
+    def __post_init__(self):
+        # 스냅샷마다 고유 번호 (렌더링 캐시 등의 무효화 기준)
+        object.__setattr__(self, 'version', next(_versions))
+        object.__setattr__(self, '_scaled', {})
+        object.__setattr__(self, '_scaled_lock', threading.Lock())
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+    @classmethod
+    def from_source_config(cls, source_config):
+        # config.json 소스 설정 -> 스냅샷 (없는 값은 기본값)
+        source_config = source_config or {}
+        canvas_size = source_config.get('canvas_size')
+        imgsz = source_config.get('imgsz')
+        return cls(
+            zones=parse_zones(source_config.get('zones', [])),
+            expand_ratio=float(source_config.get('expand_ratio', 0) or 0),
+            canvas_size=tuple(canvas_size) if canvas_size else None,
+            conf=float(source_config.get('conf', 0.5)),
+            height_limit=int(source_config.get('height_limit', 0)),
+            elbow_angle=int(source_config.get('elbow_angle', 0)),
+            reach_enabled=bool(source_config.get('reach_enabled', False)),
+            fall_enabled=bool(source_config.get('fall_enabled', False)),
+            rules=tuple(compile_rules(source_config.get('rules', []))),
+            imgsz=int(imgsz) if imgsz else None,
+            draw_objects=bool(source_config.get('draw_objects', True)),
+            draw_zones=bool(source_config.get('draw_zones', True)),
+            show_only_alert=bool(source_config.get('show_only_alert', False))
+        )
+
+    def scaled_zones(self, width, height):
+        # 프레임 크기에 맞춘 Red/Yellow 구역 (크기별로 한 번만 계산)
+        key = (width, height)
+        zones = self._scaled.get(key)
+        if zones is not None:
+            return zones
+
+        scale = np.array([1.0, 1.0])
+        if self.canvas_size:
+            scale = np.array([width / self.canvas_size[0], height / self.canvas_size[1]])
+
+        zones = []
+        for zone in self.zones:
+            red_pts = (zone['points'] * scale).astype(np.int32).reshape((-1, 1, 2))
+            zones.append({
+                'id': zone['id'],
+                'type': zone['type'],
+                'red_pts': red_pts,
+                'yellow_pts': expand_polygon(red_pts.reshape(-1, 2), self.expand_ratio)
+            })
+        zones = tuple(zones)
+        with self._scaled_lock:
+            self._scaled[key] = zones
+        return zones
@@ -0,0 +1,155 @@
+import os
+import re
+import time
+import atexit
+import threading
+import numpy as np
+
+# 소스별 감지 위치 히트맵
+# - 화면을 GRID_ROWS x GRID_COLS 칸으로 나누고 (위치는 0~1 비율이라 해상도와 무관)
+#   경고가 난 사람의 위치를 등급별(danger / warning) 칸에 누적
+# - 분석 프레임마다 메모리 배열에 바로 더하고 SAVE_INTERVAL 마다 변경된 소스만 파일로 저장
+# - /api/heatmap 은 로그를 다시 읽지 않고 이 배열을 그대로 반환
+
+HEATMAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'archive', 'heatmaps')
+
+GRID_ROWS = 36
+GRID_COLS = 64
+LEVELS = ('danger', 'warning')
+SAVE_INTERVAL = 60.0 # 파일 저장 주기 (초)
+
+
+def heatmap_path(source):
+    name = re.sub(r'[^0-9A-Za-z._-]', '_', str(source))
+    return os.path.join(HEATMAP_DIR, name + '.npz')
+
+
+class Heatmap:
+    def __init__(self, source):
+        self.source = source
+        self.path = heatmap_path(source)
+        self.grid = np.zeros((len(LEVELS), GRID_ROWS, GRID_COLS), np.int64)
+        self.updated = None
+        self.dirty = False
+        self.lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            try:
+                with np.load(self.path) as data:
+                    grid = data['grid']
+                if grid.shape == self.grid.shape:
+                    self.grid = grid.astype(np.int64)
+                    self.updated = os.path.getmtime(self.path)
+                else:
+                    print(f"히트맵 크기가 달라서 새로 시작합니다: {self.path}")
+            except Exception as e:
+                print(f"히트맵 로드 오류: {e}")
+
+    def add(self, level, xs, ys):
+        # xs, ys: 0~1 비율 좌표 배열
+        layer = LEVELS.index(level) if level in LEVELS else 0
+        cols = np.clip((np.asarray(xs) * GRID_COLS).astype(np.int64), 0, GRID_COLS - 1)
+        rows = np.clip((np.asarray(ys) * GRID_ROWS).astype(np.int64), 0, GRID_ROWS - 1)
+        with self.lock:
+            np.add.at(self.grid[layer], (rows, cols), 1) # 같은 칸이 여러 번 나와도 모두 누적
+            self.updated = time.time()
+            self.dirty = True
+
+    def save(self):
+        with self.lock:
+            if not self.dirty:
+                return
+            grid = self.grid.copy()
+            self.dirty = False
+        try:
+            os.makedirs(HEATMAP_DIR, exist_ok=True)
+            tmp = self.path + '.part'
+            with open(tmp, 'wb') as f:
+                np.savez(f, grid=grid, source=np.array(str(self.source))) # 파일 이름은 치환된 값이라 원래 키도 저장
+            os.replace(tmp, self.path)
+        except Exception as e:
+            self.dirty = True
+            print(f"히트맵 저장 오류 ({self.source}): {e}")
+
+    def to_dict(self, level=None):
+        # level 이 없으면 전체 등급 합계
+        with self.lock:
+            if level in LEVELS:
+                grid = self.grid[LEVELS.index(level)].copy()
+            else:
+                grid = self.grid.sum(axis=0)
+            totals = {name: int(self.grid[i].sum()) for i, name in enumerate(LEVELS)}
+        return {
+            'source': self.source,
+            'level': level if level in LEVELS else 'all',
+            'rows': GRID_ROWS,
+            'cols': GRID_COLS,
+            'grid': grid.tolist(),
+            'max': int(grid.max()),
+            'totals': totals,
+            'updated': time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.updated)) if self.updated else None
+        }
+
+
+class HeatmapStore:
+    def __init__(self):
+        self.heatmaps = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def get(self, source):
+        with self.lock:
+            heatmap = self.heatmaps.get(source)
+            if heatmap is None:
+                heatmap = Heatmap(source) # 저장된 파일이 있으면 이어서 누적
+                self.heatmaps[source] = heatmap
+            return heatmap
+
+    def find(self, source):
+        # 메모리나 파일에 있는 히트맵 (없으면 None, 새로 만들지 않음)
+        with self.lock:
+            heatmap = self.heatmaps.get(source)
+        if heatmap is None and os.path.exists(heatmap_path(source)):
+            heatmap = self.get(source)
+        return heatmap
+
+    def record(self, source, level, xs, ys):
+        if len(xs):
+            self.get(source).add(level, xs, ys)
+
+    def sources(self):
+        # 메모리에 있는 소스 + 저장된 파일만 있는 소스
+        with self.lock:
+            names = {str(s) for s in self.heatmaps}
+        if os.path.isdir(HEATMAP_DIR):
+            for f in os.listdir(HEATMAP_DIR):
+                if not f.endswith('.npz'):
+                    continue
+                try:
+                    with np.load(os.path.join(HEATMAP_DIR, f)) as data:
+                        names.add(str(data['source']))
+                except Exception:
+                    pass
+        return sorted(names)
+
+    def save_all(self):
+        with self.lock:
+            items = list(self.heatmaps.values())
+        for heatmap in items:
+            heatmap.save()
+
+    def start(self):
+        # 주기적 저장 스레드 (종료 시에도 한 번 저장)
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self._run, name='heatmap-saver', daemon=True)
+        self.thread.start()
+        atexit.register(self.save_all)
+
+    def _run(self):
+        while True:
+            time.sleep(SAVE_INTERVAL)
+            self.save_all()
+
+
+heatmaps = HeatmapStore()
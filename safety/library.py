@@ -0,0 +1,168 @@
+import os
+import queue
+import threading
+import cv2
+from . import database
+
+# 업로드 영상 라이브러리
+# - 영상 목록/메타데이터는 DB(videos 테이블)에 인덱싱
+# - 해상도/FPS/길이 분석과 썸네일 생성은 백그라운드 워커에서 수행
+# - 업로드 폴더가 바뀌면(파일 복사/삭제 -> 폴더 수정 시각 변경) 목록 조회 시 인덱스 다시 동기화
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+THUMBNAIL_WIDTH = 320
+UPLOAD_CHUNK_SIZE = 1024 * 1024 # 업로드 저장 단위 (1MB)
+
+
+def is_video_file(filename):
+    return filename.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def save_stream(stream, filepath, chunk_size=UPLOAD_CHUNK_SIZE):
+    # 업로드 스트림을 청크 단위로 임시 파일에 쓴 뒤 교체 (메모리에 전체를 올리지 않음)
+    tmp_path = filepath + '.part'
+    size = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(tmp_path, filepath)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return size
+
+
+def probe_video(filepath, thumb_path):
+    # 영상 메타데이터 분석 + 썸네일 저장
+    cap = cv2.VideoCapture(filepath)
+    if not cap.isOpened():
+        return None
+    try:
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = frame_count / fps if fps > 0 else None
+
+        # 영상 앞부분(10% 지점)을 썸네일로 사용
+        if frame_count > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count * 0.1))
+        success, frame = cap.read()
+        thumbnail = None
+        if success:
+            scale = THUMBNAIL_WIDTH / frame.shape[1]
+            thumb = cv2.resize(frame, (THUMBNAIL_WIDTH, max(1, int(frame.shape[0] * scale))),
+                               interpolation=cv2.INTER_AREA)
+            if cv2.imwrite(thumb_path, thumb):
+                thumbnail = os.path.basename(thumb_path)
+
+        return {
+            'width': width,
+            'height': height,
+            'fps': round(fps, 3),
+            'frame_count': frame_count,
+            'duration': round(duration, 2) if duration else None,
+            'thumbnail': thumbnail
+        }
+    finally:
+        cap.release()
+
+
+class VideoLibrary:
+    def __init__(self, upload_folder, thumb_folder):
+        self.upload_folder = upload_folder
+        self.thumb_folder = thumb_folder
+        self.queue = queue.Queue()
+        self.thread = None
+        self.sync_lock = threading.Lock()
+        self.synced_mtime = None # 마지막으로 동기화한 시점의 업로드 폴더 수정 시각
+
+    def start(self):
+        # 워커 시작 + 업로드 폴더와 인덱스 동기화
+        if self.thread is not None:
+            return
+        os.makedirs(self.thumb_folder, exist_ok=True)
+        self.thread = threading.Thread(target=self._worker, name='video-library', daemon=True)
+        self.thread.start()
+        self.queue.put(('sync', None))
+
+    def add(self, filename):
+        # 업로드 직후 호출: 인덱스 등록 후 분석은 워커에 맡김
+        filepath = os.path.join(self.upload_folder, filename)
+        stat = os.stat(filepath)
+        database.upsert_video(filename, stat.st_size, stat.st_mtime)
+        self.queue.put(('probe', filename))
+
+    def list(self, page=1, per_page=50):
+        # 시작 후 폴더에 직접 복사/삭제된 파일도 목록에 반영
+        try:
+            if os.stat(self.upload_folder).st_mtime != self.synced_mtime:
+                self._sync()
+        except Exception as e:
+            print(f"영상 라이브러리 동기화 오류: {e}")
+        rows, total = database.get_video_page(page, per_page)
+        if rows is None:
+            # DB를 사용할 수 없으면 폴더 목록으로 대체
+            names = sorted(f for f in os.listdir(self.upload_folder) if is_video_file(f))
+            start = (page - 1) * per_page
+            rows = [{'filename': f, 'status': 'unindexed'} for f in names[start:start + per_page]]
+            total = len(names)
+        return rows, total
+
+    def thumbnail_path(self, filename):
+        return os.path.join(self.thumb_folder, filename + '.jpg')
+
+    def _sync(self):
+        with self.sync_lock:
+            # 동기화 도중 바뀐 내용은 다음 조회에서 다시 반영되도록 목록을 읽기 전 시각을 기록
+            mtime = os.stat(self.upload_folder).st_mtime
+            index = database.get_video_index()
+            if index is None:
+                return
+            self._sync_index(index)
+            self.synced_mtime = mtime
+
+    def _sync_index(self, index):
+        files = {f for f in os.listdir(self.upload_folder) if is_video_file(f)}
+
+        for filename in sorted(files):
+            stat = os.stat(os.path.join(self.upload_folder, filename))
+            row = index.get(filename)
+            if row is None or row['size'] != stat.st_size or int(row['mtime']) != int(stat.st_mtime):
+                database.upsert_video(filename, stat.st_size, stat.st_mtime)
+                self.queue.put(('probe', filename))
+            elif row['status'] == 'pending':
+                self.queue.put(('probe', filename))
+
+        removed = [f for f in index if f not in files]
+        database.delete_videos(removed)
+        for filename in removed:
+            thumb = self.thumbnail_path(filename)
+            if os.path.exists(thumb):
+                os.remove(thumb)
+
+    def _probe(self, filename):
+        filepath = os.path.join(self.upload_folder, filename)
+        if not os.path.exists(filepath):
+            return
+        meta = probe_video(filepath, self.thumbnail_path(filename))
+        if meta is None:
+            database.update_video_metadata(filename, {}, status='error')
+        else:
+            database.update_video_metadata(filename, meta)
+
+    def _worker(self):
+        while True:
+            task, filename = self.queue.get()
+            try:
+                if task == 'sync':
+                    self._sync()
+                else:
+                    self._probe(filename)
+            except Exception as e:
+                print(f"영상 라이브러리 작업 오류 ({task}, {filename}): {e}")
@@ -1,51 +1,262 @@
+import os
 import cv2
-import torch
 import time
-from ultralytics import YOLO
+import threading
+import numpy as np
 from .detector import SafetyDetector
+from .pose import PoseResult
+from . import render
+from .result_cache import PoseCache
+from .tuning import int8_model_path
+from .cascade import PERSON_DETECTOR, PERSON_CLASS, zone_rects, select_near_zones, crop_boxes, merge_crop_poses
+from .startup import timer
+from .stream import readers, is_live_source
+
+def normalize_source(src):
+    # '0' 같은 숫자 문자열은 웹캠 번호로 변환
+    if isinstance(src, str) and src.isdigit():
+        return int(src)
+    return src
+
+def is_file_source(src):
+    return isinstance(src, str) and not src.startswith('http') and not src.startswith('rtsp')
+
+def open_capture(src):
+    # 웹캠인 경우 DSHOW 백엔드 사용 (윈도우 호환성 향상)
+    if isinstance(src, int):
+        return cv2.VideoCapture(src, cv2.CAP_DSHOW)
+    # [추가] 실시간 스트림은 공유 읽기 스레드의 최신 프레임 사용 (밀린 프레임은 버리고 끊기면 자동 재연결)
+    if is_live_source(src):
+        return readers.acquire(src)
+    return cv2.VideoCapture(src)
+
+RECONNECTING_TEXT = 'Reconnecting...'
+
+def get_video_fps(cap):
+    # 동영상 원본 FPS 확인 (속도 동기화용)
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    if not video_fps or video_fps <= 0:
+        video_fps = 30 # 기본값
+    return video_fps
 
 class AIModel:
     def __init__(self, model_path='yolov8n-pose.pt'): # 생성자
-        # GPU 사용 가능 여부 확인 및 장치 설정
-        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
-        print(f"AI 모델 실행 장치: {self.device}")
-        if self.device == 'cuda':
-            print(f"GPU 정보: {torch.cuda.get_device_name(0)}")
-
+        # [수정] 생성 시에는 모델을 불러오지 않음 (torch/ultralytics 로딩은 start_loading에서)
+        self.device = None # load() 에서 결정
+        self.model = None
         self.model_name = model_path
-        self.set_model(model_path)
+        self.int8 = False # CPU INT8 양자화 모델 사용 여부
+        self.cascade = False # 2단계 감지 (사람 감지 -> 구역 근처만 포즈 추론) 사용 여부
+        self.person_model = None # cascade 1단계 사람 감지 모델
+        self.model_generation = 0 # 모델을 교체할 때마다 증가 (늦게 끝난 백그라운드 로딩이 덮어쓰지 않도록)
+
+        # 백그라운드 로딩 상태
+        self.ready = threading.Event()
+        self.load_error = None
+        self.load_thread = None
+        self.load_lock = threading.Lock()
+
         self.source = 0  # 기본값: 웹캠 (0)
         self.source_key = 'webcam' # 설정 저장용 키
         
         # 성능 최적화 설정
         self.skip_frames = 3  # 3프레임마다 1번만 분석 (부하 감소)
         self.latest_result = None # 마지막 분석 결과 저장용
+        self.cache_results = True # 동영상 파일 추론 결과 캐시 사용 여부
+        self.infer_lock = threading.Lock() # 여러 스트림/모니터가 모델 하나를 공유
         
         # 감지기 인스턴스 생성 (알고리즘 분리)
         self.detector = SafetyDetector()
 
-    def set_model(self, model_path):
+    def init_device(self):
+        # GPU 사용 가능 여부 확인 및 장치 설정
+        if self.device is not None:
+            return
+        import torch
+        self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        print(f"AI 모델 실행 장치: {self.device}")
+        if self.device == 'cuda':
+            print(f"GPU 정보: {torch.cuda.get_device_name(0)}")
+
+    def start_loading(self):
+        # 모델 로딩 + 워밍업을 백그라운드 스레드에서 1회 수행
+        with self.load_lock:
+            if self.load_thread is not None or self.ready.is_set():
+                return
+            self.load_thread = threading.Thread(target=self.load, name='model-loader', daemon=True)
+            self.load_thread.start()
+
+    def load(self):
+        try:
+            timer.mark('model_load_start')
+            # 로딩 중에 사용자가 다른 모델로 바꿨으면 그 모델을 유지
+            self.set_model(self.model_name, generation=self.model_generation)
+            timer.mark('model_loaded')
+            self.warmup()
+            timer.mark('model_warmed_up')
+            self.ready.set()
+        except Exception as e:
+            self.load_error = str(e)
+            print(f"AI 모델 로딩 실패: {e}")
+            with self.load_lock:
+                self.load_thread = None # 다음 start_loading() 호출 시 다시 시도
+
+    def warmup(self):
+        # 첫 추론의 초기화 비용(CUDA 컨텍스트, 그래프 최적화 등)을 미리 지불
+        size = self.imgsz or 640
+        blank = np.zeros((size, size, 3), np.uint8)
+        self.infer_pose(blank, 0.5, size)
+        if self.cascade:
+            self.infer(blank, 0.5, size)
+
+    def is_ready(self):
+        return self.ready.is_set()
+
+    def set_model(self, model_path, int8=None, cascade=None, generation=None):
         # 모델 교체 메서드
+        # generation 이 주어지면 그 사이에 다른 모델로 교체된 경우 교체하지 않음 (-> False)
+        from ultralytics import YOLO
+        self.init_device()
+        if int8 is None:
+            int8 = self.int8
+        if cascade is None:
+            cascade = self.cascade
         print(f"AI 모델 교체중...({model_path})")
-        self.model = YOLO(model_path)
-        self.model_name = model_path
-        self.latest_result = None
-        print(f"AI 모델 교체 완료: {self.model_name}")
 
-    def set_source(self, source, source_key='webcam'):
+        load_path = model_path
+        if int8:
+            # INT8 양자화 모델은 CPU에서만 사용 (download_models.py --int8 로 생성)
+            quant_path = int8_model_path(model_path)
+            if self.device != 'cpu':
+                print("INT8 모델은 CPU 전용입니다. 원본 모델을 사용합니다.")
+            elif os.path.exists(quant_path):
+                load_path = quant_path
+            else:
+                print(f"INT8 모델이 없습니다: {quant_path}")
+
+        # 파일 로딩은 락 밖에서 (그동안 기존 모델로 계속 추론)
+        model = YOLO(load_path, task='pose')
+        # [추가] cascade 사용 시 1단계 사람 감지 모델 (처음 한 번만 로딩)
+        person_model = self.person_model
+        if cascade and person_model is None:
+            person_model = YOLO(PERSON_DETECTOR)
+            print(f"사람 감지 모델 로딩 완료: {PERSON_DETECTOR}")
+
+        # [수정] 추론 중간에 모델이 바뀌지 않도록 추론 락을 잡고 한 번에 교체
+        with self.infer_lock:
+            if generation is not None and generation != self.model_generation:
+                print(f"다른 모델로 이미 교체되어 로딩 결과를 버립니다: {load_path}")
+                return False
+            self.model = model
+            self.model_name = model_path
+            self.int8 = load_path != model_path # 실제로 INT8 모델을 불러온 경우만 (FP32 대체 시 False)
+            self.person_model = person_model
+            self.cascade = bool(cascade)
+            self.latest_result = None
+            self.model_generation += 1
+        print(f"AI 모델 교체 완료: {load_path}")
+        self.load_error = None
+        if generation is None and not self.ready.is_set():
+            # 백그라운드 로딩이 실패했던 경우: 직접 교체한 모델로 준비 완료 처리
+            self.warmup()
+            self.ready.set()
+        return True
+
+    @property
+    def imgsz(self):
+        # 추론 입력 크기 (소스별 감지기 설정 스냅샷에 포함)
+        return self.detector.config.imgsz
+
+    def set_imgsz(self, imgsz):
+        # 소스별 추론 입력 크기 (config.json 'imgsz')
+        self.detector.update(imgsz=int(imgsz) if imgsz else None)
+        print(f"추론 입력 크기: {self.imgsz or '기본값'}")
+
+    def cache_model_key(self, imgsz=None):
+        # 추론 결과를 바꾸는 설정 조합 (캐시 구분용)
+        name = os.path.splitext(os.path.basename(self.model_name))[0]
+        return f"{name}{'-int8' if self.int8 else ''}-{imgsz or 'default'}"
+
+    @property
+    def model_key(self):
+        return self.cache_model_key(self.imgsz)
+
+    def infer_kwargs(self, conf, imgsz=None):
+        kwargs = {'verbose': False, 'device': self.device, 'conf': conf}
+        if imgsz:
+            kwargs['imgsz'] = imgsz
+        return kwargs
+
+    def infer_pose(self, frame, conf, imgsz=None):
+        # 포즈 모델로 프레임 전체 추론 -> PoseResult
+        with self.infer_lock:
+            results = self.model(frame, **self.infer_kwargs(conf, imgsz))
+        return PoseResult.from_yolo(results[0])
+
+    def infer_cascade(self, frame, conf, imgsz=None, config=None):
+        # [추가] 사람 감지 -> 구역 근처 사람 crop만 포즈 추론 -> 원래 좌표로 합침
+        cfg = config if config is not None else self.detector.config
+        h, w = frame.shape[:2]
+        kwargs = self.infer_kwargs(conf, imgsz)
+
+        with self.infer_lock:
+            det = self.person_model(frame, classes=[PERSON_CLASS], **kwargs)[0]
+            boxes = det.boxes.xyxy.cpu().numpy().astype(np.float32)
+            scores = det.boxes.conf.cpu().numpy().astype(np.float32)
+
+            # 선언형 규칙은 구역과 무관할 수 있으므로 규칙이 있으면 모든 사람을 추론
+            if cfg.rules:
+                selected = np.ones(len(boxes), bool)
+            else:
+                selected = select_near_zones(boxes, zone_rects(cfg.scaled_zones(w, h)))
+            crops = crop_boxes(boxes, w, h)
+            selected &= (crops[:, 2] > crops[:, 0]) & (crops[:, 3] > crops[:, 1])
+            crops = crops[selected]
+
+            crop_poses = []
+            if len(crops):
+                images = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in crops]
+                crop_poses = [PoseResult.from_yolo(r) for r in self.model(images, **kwargs)]
+
+        return merge_crop_poses(boxes, scores, selected, crops, crop_poses)
+
+    def infer(self, frame, conf, imgsz=None, config=None):
+        # 단일 프레임 추론 -> PoseResult (cascade 모드면 2단계 감지)
+        if self.cascade and self.person_model is not None:
+            pose = self.infer_cascade(frame, conf, imgsz, config)
+        else:
+            pose = self.infer_pose(frame, conf, imgsz)
+        if self.ready.is_set():
+            timer.mark('first_inference_frame')
+        return pose
+
+    def analyze(self, frame, conf, imgsz=None, cache=None, frame_index=None, config=None):
+        # 캐시가 있으면 캐시 우선, 없으면 추론 후 캐시에 기록
+        # (cascade 결과는 구역 설정에 따라 달라지므로 캐시하지 않음)
+        # 캐시 기록 conf 보다 낮은 conf 는 캐시에 없는 사람이 있을 수 있으므로 직접 추론
+        if cache is None or self.cascade or conf < cache.conf:
+            return self.infer(frame, conf, imgsz, config)
+        pose = cache.get(frame_index)
+        if pose is None:
+            # 캐시 기록 conf(낮은 값)로 추론해서 저장 -> conf를 바꿔도 캐시 재사용 가능
+            pose = self.infer(frame, cache.conf, imgsz)
+            cache.put(frame_index, pose)
+        return pose.filter_conf(conf)
+
+    def set_source(self, source, source_key='webcam', source_config=None):
         # 소스 변경 (0, 파일경로, RTSP 주소 등)
         print(f"영상 소스 변경: {source} (Key: {source_key})")
         self.source = source
         self.source_key = source_key
         self.latest_result = None
+        self.detector.set_source(source_key) # [수정] 로그 / 이벤트 / 히트맵도 이 소스 이름으로 기록
         
-        # 소스 변경 시 감지기 설정 초기화 (routes.py에서 다시 설정됨)
-        self.detector.update_zones([], 0.0, None)
-        self.detector.update_config(0.5, 0, 0, False, False) # fall_enabled 추가
+        # [수정] 소스 설정 전체를 스냅샷 하나로 만들어 한 번에 교체 (없으면 기본값)
+        self.detector.apply_source_config(source_config)
 
     def set_conf(self, conf):
         # 단독 신뢰도 변경 (detector에도 반영)
-        self.detector.conf = float(conf)
+        self.detector.update_conf(conf)
 
     def set_zones(self, zones, expand_ratio, canvas_size=None):
         # 구역 정보 업데이트
@@ -58,89 +269,110 @@ class AIModel:
         print(f"감지 설정 업데이트 (Detector)")
 
     def generate_frames(self):  # 실시간 영상 프레임 만들기
+        # 모델이 아직 준비되지 않았으면 로딩 시작 (준비 전에는 원본 영상만 송출)
+        self.start_loading()
+
         # 현재 설정된 소스로 카메라/비디오 열기
-        src = self.source
-        if isinstance(src, str) and src.isdigit():
-            src = int(src)
-            
-        # 웹캠인 경우 DSHOW 백엔드 사용 (윈도우 호환성 향상)
-        if isinstance(src, int):
-            cap = cv2.VideoCapture(src, cv2.CAP_DSHOW)
-        else:
-            cap = cv2.VideoCapture(src)
+        src = normalize_source(self.source)
+        cap = open_capture(src)
         
         if not cap.isOpened():
             print(f"영상을 열 수 없습니다: {src}")
             return
 
-        # 동영상 원본 FPS 확인 (속도 동기화용)
-        video_fps = cap.get(cv2.CAP_PROP_FPS)
-        if not video_fps or video_fps <= 0:
-            video_fps = 30 # 기본값
-        
+        video_fps = get_video_fps(cap)
         frame_duration = 1.0 / video_fps # 1프레임당 걸려야 하는 시간
 
         prev_time = 0
         frame_count = 0
+        is_file = is_file_source(src)
+        is_live = is_live_source(src)
+
+        # [추가] 동영상 파일은 추론 결과를 캐시 (반복 재생 시 모델 재실행 없이 재사용)
+        cache = None
 
-        while True:
-            loop_start = time.time() # 루프 시작 시간 측정
-
-            success, frame = cap.read()
-            if not success:
-                # 동영상 파일인 경우 무한 반복
-                if isinstance(src, str) and not src.startswith('http') and not src.startswith('rtsp'):
-                     cap.release()
-                     cap = cv2.VideoCapture(src)
-                     continue
-                else:
-                    # 스트림 종료 시 루프 중단
-                    break
+        try:
+            while True:
+                loop_start = time.time() # 루프 시작 시간 측정
+
+                success, frame = cap.read()
+                if not success:
+                    # 동영상 파일인 경우 무한 반복
+                    if is_file:
+                         if cache is not None:
+                             cache.finish(frame_count)
+                         cap.release()
+                         cap = cv2.VideoCapture(src)
+                         frame_count = 0 # 파일 내 프레임 위치 기준으로 분석 (캐시 인덱스와 일치)
+                         continue
+                    elif is_live:
+                        # [수정] 재연결은 읽기 스레드가 담당 -> 시청자 연결을 끊지 않고 안내 화면 전송
+                        # (전송해야 시청자가 나간 것을 알 수 있음 -> GeneratorExit 로 스트림 반환)
+                        yield (b'--frame\r\n'
+                               b'Content-Type: image/jpeg\r\n\r\n' + render.placeholder_jpeg(RECONNECTING_TEXT) + b'\r\n')
+                        continue
+                    else:
+                        # 스트림 종료 시 루프 중단
+                        break
             
-            frame_count += 1
-
-            # [최적화] 지정된 간격마다 AI 분석 수행
-            if frame_count % self.skip_frames == 0:
-                try:
-                    # 추론 시에는 설정된 conf 사용
-                    results = self.model(frame, verbose=False, device=self.device, conf=self.detector.conf)
-                    self.latest_result = results[0]
-                except Exception:
-                    pass
+                frame_count += 1
+
+                # 이번 프레임에서 사용할 설정 스냅샷 (프레임 도중 설정 변경 영향 없음)
+                cfg = self.detector.config
+
+                # [최적화] 지정된 간격마다 AI 분석 수행
+                if frame_count % self.skip_frames == 0 and self.ready.is_set():
+                    try:
+                        if is_file and self.cache_results:
+                            model_key = self.cache_model_key(cfg.imgsz)
+                            if cache is None or cache.model_key != model_key:
+                                if cache is not None:
+                                    cache.finish(frame_count) # imgsz 등이 바뀌면 이전 설정의 결과 먼저 저장
+                                cache = PoseCache(src, model_key)
+                        elif cache is not None:
+                            cache.finish(frame_count)
+                            cache = None
+                        # 추론 시에는 설정된 conf, imgsz 사용
+                        self.latest_result = self.analyze(frame, cfg.conf, cfg.imgsz,
+                                                          cache, frame_count - 1, cfg)
+                    except Exception:
+                        pass
             
-            # 결과 처리 및 그리기 (Detector 위임)
-            if self.latest_result:
-                try:
-                    # [수정] model.py에서는 plot()을 호출하지 않음!
-                    # 모든 그리기 권한을 detector.process_frame으로 넘김
-                    frame = self.detector.process_frame(frame, self.latest_result)
-                except Exception as e:
-                    # print(f"처리 오류: {e}")
-                    pass
-
-            # FPS 계산 및 표시
-            curr_time = time.time()
-            time_diff = curr_time - prev_time
-            fps = 1 / time_diff if prev_time > 0 and time_diff > 0.001 else 0
-            prev_time = curr_time
+                # 결과 처리 및 그리기 (Detector 위임)
+                if self.latest_result:
+                    try:
+                        # [수정] model.py에서는 plot()을 호출하지 않음!
+                        # 모든 그리기 권한을 detector.process_frame으로 넘김
+                        frame = self.detector.process_frame(frame, self.latest_result, config=cfg)
+                    except Exception as e:
+                        # print(f"처리 오류: {e}")
+                        pass
+
+                # FPS 계산 및 표시
+                curr_time = time.time()
+                time_diff = curr_time - prev_time
+                fps = 1 / time_diff if prev_time > 0 and time_diff > 0.001 else 0
+                prev_time = curr_time
             
-            # 화면 좌측 상단에 FPS와 장치 정보 표시
-            cv2.putText(frame, f"FPS: {fps:.1f} ({self.device})", (20, 40),
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                # 화면 좌측 상단에 FPS와 장치 정보 표시
+                render.draw_banner(frame, f"FPS: {fps:.1f} ({self.device or 'loading'})")
 
-            ret, buffer = cv2.imencode('.jpg', frame)
-            if not ret:
-                continue
+                ret, buffer = cv2.imencode('.jpg', frame)
+                if not ret:
+                    continue
 
-            frame_bytes = buffer.tobytes()   # 압축된 이미지 바이트를 바이트 형태로 변환
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                frame_bytes = buffer.tobytes()   # 압축된 이미지 바이트를 바이트 형태로 변환
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
             
-            # [속도 제어] 동영상 파일인 경우 원본 속도에 맞게 대기
-            if isinstance(src, str) and not src.startswith('http') and not src.startswith('rtsp'):
-                elapsed = time.time() - loop_start
-                delay = frame_duration - elapsed
-                if delay > 0:
-                    time.sleep(delay)
-        
-        cap.release()
+                # [속도 제어] 동영상 파일인 경우 원본 속도에 맞게 대기
+                if is_file:
+                    elapsed = time.time() - loop_start
+                    delay = frame_duration - elapsed
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            cap.release() # 시청자가 연결을 끊어도 (GeneratorExit) 스트림 반환
+            if cache is not None:
+                cache.finish(frame_count) # [수정] 끝까지 재생하지 않았어도 새로 추론한 결과 저장
+
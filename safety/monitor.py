@@ -0,0 +1,310 @@
+import time
+import threading
+import cv2
+from .detector import SafetyDetector
+from .model import normalize_source, is_file_source, open_capture, get_video_fps, RECONNECTING_TEXT
+from . import render
+from .result_cache import PoseCache
+from .stream import readers, is_live_source
+
+# 백그라운드 모니터링 서비스
+# - config.json에 설정된 소스마다 스레드 하나가 항상 추론 / 규칙 판정 / 로그 기록을 수행
+# - 대시보드 시청자(/video_feed 구독자)가 있을 때만 그리기와 JPEG 인코딩을 수행
+# - /snapshot 요청이 최근에 있었으면 시청자가 없어도 낮은 주기로 인코딩해서 최신 JPEG 유지
+
+RECONNECT_DELAY = 5.0 # 소스 열기 실패 / 스트림 종료 시 재시도 간격 (초)
+SNAPSHOT_KEEPALIVE = 10.0 # 마지막 스냅샷 요청 후 인코딩을 유지할 시간 (초)
+SNAPSHOT_FPS = 2.0 # 스냅샷 요청만 있을 때의 인코딩 주기 (초당)
+SNAPSHOT_WAIT = 2.0 # 최신 프레임이 없을 때 새 프레임을 기다리는 시간 (초)
+THUMBNAIL_CACHE_SIZE = 8 # 최신 프레임의 썸네일 크기별 캐시 수
+
+
+class MonitorService:
+    def __init__(self, ai_model, source_key, source, source_config=None):
+        self.ai = ai_model
+        self.source_key = source_key
+        self.source = normalize_source(source)
+        self.is_file = is_file_source(self.source)
+        self.is_live = is_live_source(self.source) # 공유 읽기 스레드가 최신 프레임 / 재연결 담당
+
+        # 소스별 감지기 (로그 소스 이름 = 설정 키)
+        self.detector = SafetyDetector()
+        self.detector.set_source(source_key)
+        self.source_config = source_config
+        self.detector.apply_source_config(source_config)
+
+        # 시청자 / 최신 프레임 공유
+        self.cond = threading.Condition()
+        self.viewers = 0
+        self.latest_jpeg = None
+        self.latest_time = 0.0 # 최신 프레임의 캡처 시각 (지연 시간 측정용)
+        self.latest_frame = None # 최신 그리기 결과 (썸네일 생성용)
+        self.frame_seq = 0
+
+        # 스냅샷 (ETag = 서비스 시작 시각 + 프레임 순번)
+        self.epoch = format(int(time.time() * 1000), 'x')
+        self.snapshot_requested = 0.0
+        self.last_encode = 0.0
+        self.thumbnails = {} # (프레임 순번, 너비) -> JPEG
+
+        # 상태 정보
+        self.fps = 0.0
+        self.frames_processed = 0
+        self.running = False
+        self.thread = None
+
+    def apply_config(self, source_config):
+        # 새 설정 스냅샷으로 교체 (처리 중인 프레임은 이전 스냅샷으로 마무리)
+        # 같은 설정이 다시 오면 무시 (코디네이터의 반복 배정 등 -> 그리기 캐시 유지)
+        if source_config == self.source_config:
+            return
+        self.source_config = source_config
+        self.detector.apply_source_config(source_config)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name=f"monitor-{self.source_key}", daemon=True)
+        self.thread.start()
+        print(f"백그라운드 모니터링 시작: {self.source_key}")
+
+    def stop(self):
+        self.running = False
+        with self.cond:
+            self.cond.notify_all()
+
+    def status(self):
+        return {
+            'source': self.source_key,
+            'running': self.running,
+            'viewers': self.viewers,
+            'fps': round(self.fps, 1),
+            'frames': self.frames_processed,
+            'stream': readers.status(self.source) if self.is_live else None # 지연 / 버린 프레임 / 재연결 수
+        }
+
+    # 시청자용 MJPEG 스트림 (구독 중에만 그리기/인코딩 수행)
+    def stream(self):
+        with self.cond:
+            self.viewers += 1
+            last_seq = self.frame_seq
+        try:
+            while self.running:
+                with self.cond:
+                    self.cond.wait_for(lambda: self.frame_seq != last_seq or not self.running, timeout=5.0)
+                    if self.frame_seq == last_seq:
+                        # 새 프레임이 없으면 (재연결 중 등) 안내 화면 전송 -> 나간 시청자 확인
+                        frame_bytes = render.placeholder_jpeg(RECONNECTING_TEXT) if self.running else None
+                        capture_time = time.time()
+                    else:
+                        last_seq = self.frame_seq
+                        frame_bytes = self.latest_jpeg
+                        capture_time = self.latest_time
+                if frame_bytes is None:
+                    continue
+
+                # Content-Length / X-Timestamp(캡처 시각) 헤더는 부하 테스트 클라이언트가 사용
+                headers = (f"Content-Type: image/jpeg\r\n"
+                           f"Content-Length: {len(frame_bytes)}\r\n"
+                           f"X-Timestamp: {capture_time:.6f}\r\n\r\n").encode()
+                yield b'--frame\r\n' + headers + frame_bytes + b'\r\n'
+        finally:
+            with self.cond:
+                self.viewers -= 1
+
+    # [추가] 최신 프레임 스냅샷 -> (프레임 순번, JPEG, 원본 프레임) (없으면 순번 None)
+    def snapshot(self, wait=SNAPSHOT_WAIT):
+        now = time.time()
+        self.snapshot_requested = now
+        with self.cond:
+            # 오래된 프레임뿐이면 (인코딩이 멈춰 있었던 경우) 새 프레임을 잠시 기다림
+            if self.latest_jpeg is None or now - self.latest_time > SNAPSHOT_KEEPALIVE:
+                last_seq = self.frame_seq
+                self.cond.wait_for(lambda: self.frame_seq != last_seq or not self.running, timeout=wait)
+            if self.latest_jpeg is None:
+                return None, None, None
+            return self.frame_seq, self.latest_jpeg, self.latest_frame
+
+    def snapshot_etag(self, seq, width=None):
+        return f"{self.epoch}-{seq}-{width or 'full'}"
+
+    def thumbnail(self, seq, frame, width):
+        # 축소 JPEG (같은 프레임/너비는 한 번만 인코딩)
+        key = (seq, width)
+        with self.cond:
+            jpeg = self.thumbnails.get(key)
+        if jpeg is not None:
+            return jpeg
+
+        h, w = frame.shape[:2]
+        width = min(width, w)
+        small = cv2.resize(frame, (width, max(1, round(h * width / w))), interpolation=cv2.INTER_AREA)
+        ret, buffer = cv2.imencode('.jpg', small)
+        if not ret:
+            return None
+        jpeg = buffer.tobytes()
+        with self.cond:
+            if seq == self.frame_seq and len(self.thumbnails) < THUMBNAIL_CACHE_SIZE:
+                self.thumbnails[key] = jpeg
+        return jpeg
+
+    def _publish(self, frame_bytes, capture_time, frame=None):
+        with self.cond:
+            self.latest_jpeg = frame_bytes
+            self.latest_time = capture_time
+            self.latest_frame = frame
+            self.thumbnails = {}
+            self.frame_seq += 1
+            self.cond.notify_all()
+
+    def _run(self):
+        while self.running:
+            cap = open_capture(self.source)
+            if not cap.isOpened():
+                print(f"[모니터] 영상을 열 수 없습니다: {self.source} (재시도 {RECONNECT_DELAY}초 후)")
+                cap.release()
+                time.sleep(RECONNECT_DELAY)
+                continue
+
+            try:
+                self._process(cap)
+            except Exception as e:
+                print(f"[모니터] 처리 오류 ({self.source_key}): {e}")
+            cap.release()
+
+            if self.running and not self.is_file:
+                time.sleep(RECONNECT_DELAY)
+
+    def _process(self, cap):
+        frame_duration = 1.0 / get_video_fps(cap)
+        frame_count = 0
+        latest_result = None
+        cache = None
+        prev_time = 0
+
+        try:
+            while self.running:
+                loop_start = time.time()
+
+                success, frame = cap.read()
+                capture_time = cap.capture_time if self.is_live else time.time() # 실시간 스트림은 실제로 받은 시각
+                if not success:
+                    if self.is_live:
+                        continue # 재연결 중 (읽기 스레드가 백오프로 재시도)
+                    if not self.is_file:
+                        return # 스트림 종료 -> 재연결
+                    # 동영상 파일인 경우 무한 반복
+                    if cache is not None:
+                        cache.finish(frame_count)
+                    cap.release()
+                    cap.open(self.source)
+                    frame_count = 0
+                    continue
+
+                frame_count += 1
+                cfg = self.detector.config # 프레임당 한 번만 읽는 설정 스냅샷
+
+                # 모델 준비 전에는 분석 생략
+                if frame_count % self.ai.skip_frames == 0 and self.ai.is_ready():
+                    try:
+                        if self.is_file and self.ai.cache_results:
+                            model_key = self.ai.cache_model_key(cfg.imgsz)
+                            if cache is None or cache.model_key != model_key:
+                                if cache is not None:
+                                    cache.finish(frame_count) # imgsz 등이 바뀌면 이전 설정의 결과 먼저 저장
+                                cache = PoseCache(self.source, model_key)
+                        elif cache is not None:
+                            cache.finish(frame_count)
+                            cache = None
+                        latest_result = self.ai.analyze(frame, cfg.conf, cfg.imgsz,
+                                                        cache, frame_count - 1, cfg)
+                    except Exception:
+                        pass
+
+                # 시청자가 없으면 판정/로그만 수행 (최근 스냅샷 요청이 있으면 낮은 주기로 인코딩)
+                now = time.time()
+                rendering = self.viewers > 0 or (now - self.snapshot_requested < SNAPSHOT_KEEPALIVE and
+                                                 now - self.last_encode >= 1.0 / SNAPSHOT_FPS)
+                if latest_result:
+                    try:
+                        frame = self.detector.process_frame(frame, latest_result, draw=rendering, config=cfg)
+                    except Exception:
+                        pass
+
+                curr_time = time.time()
+                time_diff = curr_time - prev_time
+                self.fps = 1 / time_diff if prev_time > 0 and time_diff > 0.001 else 0
+                prev_time = curr_time
+                self.frames_processed += 1
+
+                if rendering:
+                    render.draw_banner(frame, f"FPS: {self.fps:.1f} ({self.ai.device or 'loading'})")
+                    ret, buffer = cv2.imencode('.jpg', frame)
+                    if ret:
+                        self.last_encode = now
+                        self._publish(buffer.tobytes(), capture_time, frame)
+
+                # [속도 제어] 동영상 파일인 경우 원본 속도에 맞게 대기
+                if self.is_file:
+                    delay = frame_duration - (time.time() - loop_start)
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            if cache is not None:
+                cache.finish(frame_count) # [수정] 중지 / 재연결 시에도 새로 추론한 결과 저장
+
+
+class MonitorManager:
+    # 설정된 소스별 MonitorService 관리
+    def __init__(self, ai_model, resolve_source):
+        self.ai = ai_model
+        self.resolve_source = resolve_source # 설정 키 -> 실제 소스 (없으면 None)
+        self.services = {}
+        self.lock = threading.Lock()
+
+    def start_all(self, config):
+        for source_key, source_config in config.items():
+            self.apply_config(source_key, source_config)
+
+    def apply_config(self, source_key, source_config):
+        # 실행 중이면 설정만 갱신, 없으면 새로 시작 (monitor: false 이면 중지)
+        with self.lock:
+            service = self.services.get(source_key)
+            if source_config.get('monitor', True) is False:
+                if service is not None:
+                    service.stop()
+                    del self.services[source_key]
+                return None
+
+            if service is not None:
+                service.apply_config(source_config)
+                return service
+
+            source = self.resolve_source(source_key)
+            if source is None:
+                return None
+            service = MonitorService(self.ai, source_key, source, source_config)
+            self.services[source_key] = service
+        service.start()
+        return service
+
+    def retain(self, source_keys):
+        # 목록에 없는 소스 모니터링 중지 (워커 재배정용)
+        source_keys = set(source_keys)
+        with self.lock:
+            for source_key in list(self.services):
+                if source_key not in source_keys:
+                    self.services.pop(source_key).stop()
+
+    def get(self, source_key):
+        return self.services.get(source_key)
+
+    def stop_all(self):
+        with self.lock:
+            for service in self.services.values():
+                service.stop()
+            self.services = {}
+
+    def status(self):
+        return [service.status() for service in list(self.services.values())]
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class PoseResult:
+    # 포즈 추론 결과를 numpy 배열로 정리한 공통 형식
+    # (YOLO Results에서 변환하거나 캐시 등에서 직접 생성)
+    def __init__(self, boxes, scores, keypoints):
+        self.boxes = boxes          # (N, 4) xyxy
+        self.scores = scores        # (N,) 박스 신뢰도
+        self.keypoints = keypoints  # (N, 17, 3) x, y, conf
+
+    def __len__(self):
+        return len(self.keypoints)
+
+    def filter_conf(self, conf):
+        # 박스 신뢰도 기준 필터링 (낮은 conf로 추론/캐시한 결과 재사용)
+        keep = self.scores >= conf
+        if keep.all():
+            return self
+        return PoseResult(self.boxes[keep], self.scores[keep], self.keypoints[keep])
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4), np.float32),
+                   np.zeros((0,), np.float32),
+                   np.zeros((0, 17, 3), np.float32))
+
+    @classmethod
+    def from_yolo(cls, result):
+        # GPU -> CPU 복사를 사람마다 하지 않고 한 번에 수행
+        if result.keypoints is None or result.boxes is None:
+            return cls.empty()
+        return cls(result.boxes.xyxy.cpu().numpy().astype(np.float32),
+                   result.boxes.conf.cpu().numpy().astype(np.float32),
+                   result.keypoints.data.cpu().numpy().astype(np.float32))
+
+
+def as_pose_result(result):
+    if isinstance(result, PoseResult):
+        return result
+    return PoseResult.from_yolo(result)
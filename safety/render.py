@@ -0,0 +1,133 @@
+import threading
+from functools import lru_cache
+from collections import OrderedDict
+import cv2
+import numpy as np
+
+# 정적 그림 캐시 (overlay)
+# - 구역 외곽선, 고정 위치 경고 문구처럼 설정이 바뀌기 전까지 같은 그림은
+#   한 번만 래스터화해서 (그려진 영역, 색상, 투명도)로 저장
+# - 프레임마다 cv2 그리기 대신 배열 연산으로 합성 (가장자리 안티에일리어싱 픽셀은 알파 합성)
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+
+class Overlay:
+    def __init__(self, shape, x0, y0, patch, alpha):
+        # 그려진 픽셀을 감싸는 사각형 영역만 저장
+        self.shape = shape      # 대상 프레임 (높이, 너비)
+        ys, xs = np.nonzero(alpha > 0)
+        if len(ys) == 0:
+            self.region = None
+            return
+        top, bottom, left, right = ys.min(), ys.max() + 1, xs.min(), xs.max() + 1
+        self.region = (y0 + top, y0 + bottom, x0 + left, x0 + right)
+        self.patch = np.ascontiguousarray(patch[top:bottom, left:right])    # 알파가 곱해진 색상
+        alpha = alpha[top:bottom, left:right].astype(np.uint8)
+
+        if ((alpha > 0) & (alpha < 255)).any():
+            # 가장자리(안티에일리어싱) 픽셀이 있으면 영역 전체를 알파 합성
+            self.mask = None
+            self.inv_alpha = cv2.merge([255 - alpha] * 3)   # 배경이 비치는 비율 (0~255)
+        else:
+            # 완전히 덮는 픽셀만 있으면 mask 복사
+            self.mask = alpha
+            self.inv_alpha = None
+
+    @classmethod
+    def render(cls, height, width, draw, region=None):
+        # 같은 그림을 검은 바탕 / 흰 바탕에 각각 그려서 그려진 픽셀과 투명도를 구함
+        # (검은 바탕 결과 = 알파가 곱해진 색상, 두 결과의 차이 = 배경이 비치는 정도)
+        # region=(x0, y0, x1, y1) 이면 그 영역만 그림 (draw 는 영역 기준 좌표로 그려야 함)
+        x0, y0, x1, y1 = region if region else (0, 0, width, height)
+        x0, y0 = max(0, x0), max(0, y0)
+        x1, y1 = min(width, x1), min(height, y1)
+        w, h = max(0, x1 - x0), max(0, y1 - y0)
+
+        base = np.zeros((h, w, 3), np.uint8)
+        probe = np.full((h, w, 3), 255, np.uint8)
+        if w and h:
+            draw(base, (x0, y0))
+            draw(probe, (x0, y0))
+        alpha = 255 - (probe.astype(np.int16) - base).max(axis=2)
+        return cls((height, width), x0, y0, base, alpha)
+
+    def apply(self, frame):
+        if self.region is None or frame.shape[:2] != self.shape:
+            return frame
+        y0, y1, x0, x1 = self.region
+        roi = frame[y0:y1, x0:x1]
+        if self.mask is not None:
+            cv2.copyTo(self.patch, self.mask, roi)
+        else:
+            cv2.add(self.patch, cv2.multiply(roi, self.inv_alpha, scale=1 / 255.0), dst=roi)
+        return frame
+
+
+class OverlayCache:
+    # 최근 사용 순서로 최대 maxsize 개 유지 (여러 스트림 스레드에서 공유)
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, build):
+        with self.lock:
+            overlay = self.items.get(key)
+            if overlay is not None:
+                self.items.move_to_end(key)
+                return overlay
+        overlay = build()
+        with self.lock:
+            self.items[key] = overlay
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+        return overlay
+
+
+_text_cache = OverlayCache(maxsize=256)
+
+
+def _render_text(height, width, text, org, scale, color, thickness):
+    # 글자 영역(+여백)만 그려서 래스터화 비용을 줄임
+    (tw, th), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+    pad = thickness + 2
+    region = (org[0] - pad, org[1] - th - pad, org[0] + tw + pad, org[1] + baseline + pad)
+
+    def draw(img, offset):
+        cv2.putText(img, text, (org[0] - offset[0], org[1] - offset[1]), FONT, scale, color, thickness)
+    return Overlay.render(height, width, draw, region)
+
+
+def draw_text(frame, text, org, scale, color, thickness):
+    # 고정 위치 문구 (경고 문구 등): 문구/위치/프레임 크기별로 한 번만 래스터화
+    # 매 프레임 바뀌는 문구에는 사용하지 말 것 (캐시 적중이 없고 다른 항목을 밀어냄)
+    h, w = frame.shape[:2]
+    key = (text, org, scale, color, thickness, h, w)
+    overlay = _text_cache.get(key, lambda: _render_text(h, w, text, org, scale, color, thickness))
+    return overlay.apply(frame)
+
+
+def draw_polylines(frame, cache, key, polygons, color, thickness):
+    # 구역 외곽선처럼 설정이 바뀌기 전까지 고정인 선 (key 에 설정 버전을 포함해야 함)
+    h, w = frame.shape[:2]
+    overlay = cache.get(key + (h, w), lambda: Overlay.render(
+        h, w, lambda img, offset: cv2.polylines(img, polygons, True, color, thickness)))
+    return overlay.apply(frame)
+
+
+@lru_cache(maxsize=8)
+def placeholder_jpeg(text, width=640, height=360):
+    # 영상이 없을 때(재연결 중 등) 시청자에게 보내는 안내 화면 JPEG
+    frame = np.full((height, width, 3), 32, np.uint8)
+    (tw, th), _ = cv2.getTextSize(text, FONT, 1, 2)
+    cv2.putText(frame, text, ((width - tw) // 2, (height + th) // 2), FONT, 1, (200, 200, 200), 2)
+    return cv2.imencode('.jpg', frame)[1].tobytes()
+
+
+def draw_banner(frame, text):
+    # 화면 왼쪽 위 FPS / 실행 장치 표시
+    # FPS 값이 거의 매 프레임 바뀌므로 캐시하지 않고 바로 그림
+    # (캐시하면 매번 래스터화 2회 + 고정 문구 캐시 항목을 밀어냄)
+    cv2.putText(frame, text, (20, 40), FONT, 1, (0, 255, 0), 2)
+    return frame
@@ -0,0 +1,135 @@
+import os
+import re
+import numpy as np
+from .pose import PoseResult
+
+# 영상 파일별 / 모델별 포즈 추론 결과 캐시
+# - <key>.idx.npy : (1 + 프레임 수, 2) int32
+#   첫 행은 헤더 [형식 버전, 기록 conf * 10000], 이후 프레임별 [시작 행, 사람 수] (분석하지 않은 프레임은 -1)
+# - <key>.dat.npy : (전체 사람 수, 56) float32 [x1, y1, x2, y2, score, 17 * (x, y, conf)]
+# 두 파일 모두 memory-map으로 열어서 필요한 프레임만 읽음
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+# 캐시 기록 시 사용하는 최소 신뢰도 (재생 시 현재 conf로 다시 필터링)
+CACHE_CONF = 0.1
+CACHE_FORMAT = 2 # 헤더 행 추가
+
+ROW_SIZE = 4 + 1 + 17 * 3
+
+
+def cache_key(video_path, model_key):
+    # 영상이 바뀌면(크기/수정 시간) 다른 키가 되도록 구성
+    stat = os.stat(video_path)
+    name = os.path.basename(video_path)
+    raw = f"{name}.{stat.st_size}.{int(stat.st_mtime)}.{model_key}"
+    return re.sub(r'[^0-9A-Za-z._-]', '_', raw)
+
+
+class PoseCache:
+    def __init__(self, video_path, model_key, cache_dir=CACHE_DIR):
+        self.key = cache_key(video_path, model_key)
+        self.model_key = model_key
+        self.idx_path = os.path.join(cache_dir, self.key + '.idx.npy')
+        self.dat_path = os.path.join(cache_dir, self.key + '.dat.npy')
+        self.cache_dir = cache_dir
+        self.conf = CACHE_CONF  # 기록 conf (이보다 낮은 conf 요청에는 캐시 사용 불가)
+
+        self.index = None   # memmap (프레임 수, 2)
+        self.data = None    # memmap (전체 사람 수, ROW_SIZE)
+        self.pending = {}   # 이번 재생에서 새로 추론한 결과 {frame_index: rows}
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    def _open(self):
+        if os.path.exists(self.idx_path) and os.path.exists(self.dat_path):
+            try:
+                index = np.load(self.idx_path, mmap_mode='r')
+                if len(index) == 0 or tuple(index[0]) != self._header():
+                    # 이전 형식이거나 기록 conf 가 달라진 캐시 -> 무시하고 새로 기록
+                    print(f"추론 캐시 형식/conf 변경으로 다시 기록: {self.key}")
+                    return
+                self.index = index[1:]
+                try:
+                    self.data = np.load(self.dat_path, mmap_mode='r')
+                except ValueError:
+                    # 사람이 한 명도 없는 영상 (빈 배열은 memory-map 불가)
+                    self.data = np.load(self.dat_path)
+            except Exception as e:
+                print(f"추론 캐시 로드 오류: {e}")
+                self.index = None
+                self.data = None
+
+    def _header(self):
+        return (CACHE_FORMAT, int(round(self.conf * 10000)))
+
+    def _close(self):
+        # memory-map 참조 해제 (윈도우에서는 열려 있는 파일을 os.replace 로 덮어쓸 수 없음)
+        # get() 결과는 복사본이라 여기서 참조를 끊으면 매핑이 바로 닫힘
+        self.index = None
+        self.data = None
+
+    def get(self, frame_index):
+        # 캐시된 결과 (없으면 None)
+        rows = None
+        if self.index is not None and frame_index < len(self.index):
+            start, count = self.index[frame_index]
+            if count >= 0:
+                rows = np.asarray(self.data[start:start + count])
+        if rows is None:
+            rows = self.pending.get(frame_index)
+        if rows is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return PoseResult(rows[:, 0:4].copy(),
+                          rows[:, 4].copy(),
+                          rows[:, 5:].reshape(-1, 17, 3).copy())
+
+    def put(self, frame_index, pose):
+        rows = np.zeros((len(pose), ROW_SIZE), np.float32)
+        rows[:, 0:4] = pose.boxes
+        rows[:, 4] = pose.scores
+        rows[:, 5:] = pose.keypoints.reshape(-1, 17 * 3)
+        self.pending[frame_index] = rows
+
+    def finish(self, total_frames):
+        # 영상 한 바퀴 재생이 끝나면 새 결과를 기존 캐시와 합쳐서 디스크에 기록
+        if not self.pending:
+            return
+
+        frames = {}
+        if self.index is not None:
+            for i in np.nonzero(self.index[:, 1] >= 0)[0]:
+                start, count = self.index[i]
+                frames[int(i)] = np.array(self.data[start:start + count]) # 복사 (memory-map 을 닫기 위해)
+        frames.update(self.pending)
+
+        total_frames = max(total_frames, max(frames) + 1)
+        index = np.full((total_frames, 2), -1, np.int32)
+        chunks = []
+        offset = 0
+        for i in sorted(frames):
+            rows = frames[i]
+            index[i] = (offset, len(rows))
+            chunks.append(rows)
+            offset += len(rows)
+        data = np.concatenate(chunks) if chunks else np.zeros((0, ROW_SIZE), np.float32)
+        index = np.vstack([np.array([self._header()], np.int32), index])
+        frames = chunks = None
+
+        self._close()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 재생 중인 다른 스트림이 있어도 안전하도록 임시 파일 후 교체
+            for path, array in ((self.dat_path, data), (self.idx_path, index)):
+                tmp = path + '.tmp.npy'
+                np.save(tmp, array)
+                os.replace(tmp, path)
+            self.pending = {}
+            print(f"추론 캐시 저장: {self.key} ({len(index) - 1} 프레임)")
+        except Exception as e:
+            print(f"추론 캐시 저장 오류: {e}")
+        self._open()
@@ -0,0 +1,203 @@
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+import pymysql
+from . import database
+from . import archive
+
+# 로그 보존 정책
+# - 최근 hot_days 일치만 logs 테이블(hot)에 유지
+# - 그보다 오래된 로그는 하루 단위로 gzip NDJSON 파일에 옮긴 뒤 hot 테이블에서 제거
+# - logs 테이블은 timestamp 기준 일별 RANGE COLUMNS 파티션으로 나누어서
+#   하루치 삭제를 DROP PARTITION 한 번으로 처리 (파티션이 없으면 배치 DELETE)
+
+# 환경변수로 변경 가능 (SAFETY_RETENTION_HOT_DAYS 등)
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        print(f"잘못된 설정값 {name}={os.environ.get(name)} (기본값 {default} 사용)")
+        return default
+
+
+RETENTION_CONFIG = {
+    'hot_days': _env_int('SAFETY_RETENTION_HOT_DAYS', 30),                  # hot 테이블 유지 기간 (일)
+    'batch_size': _env_int('SAFETY_RETENTION_BATCH_SIZE', 5000),            # 보관/삭제 배치 크기
+    'interval': _env_int('SAFETY_RETENTION_INTERVAL', 3600),                # 보존 작업 주기 (초)
+    'partition': os.environ.get('SAFETY_RETENTION_PARTITION', '1') != '0',  # 일별 파티션 사용 여부
+    'partition_ahead_days': _env_int('SAFETY_RETENTION_AHEAD_DAYS', 7)      # 미리 만들어 둘 미래 파티션 수
+}
+
+MAX_PARTITION = 'pmax'
+
+last_run = {'time': None, 'archived_days': [], 'error': None}
+
+
+def partition_name(date):
+    return 'p' + date.replace('-', '')
+
+
+def next_day(date):
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def get_partitions(c):
+    # [(파티션 이름, 상한값)] (파티션이 없는 테이블이면 빈 목록)
+    c.execute('''
+        SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'logs' AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    ''', (database.DB_CONFIG['database'],))
+    return [(row['name'], row['bound'].strip("'")) for row in c.fetchall()]
+
+
+def _partition_clause(start_date, end_date):
+    # start_date ~ end_date 일별 파티션 + pmax
+    parts = []
+    date = start_date
+    while date <= end_date:
+        parts.append(f"PARTITION {partition_name(date)} VALUES LESS THAN ('{next_day(date)}')")
+        date = next_day(date)
+    parts.append(f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)")
+    return ', '.join(parts)
+
+
+def setup_partitions(conn):
+    # 파티션이 없는 기존 logs 테이블을 일별 파티션 테이블로 변환 (최초 1회)
+    c = conn.cursor()
+    if get_partitions(c):
+        return True
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    end_date = (datetime.now() + timedelta(days=RETENTION_CONFIG['partition_ahead_days'])).strftime("%Y-%m-%d")
+    c.execute("SELECT MIN(timestamp) AS oldest FROM logs")
+    oldest = c.fetchone()['oldest']
+    start_date = oldest[:10] if oldest else today
+
+    print("logs 테이블 일별 파티션 변환 중...")
+    # 파티션 키(timestamp)는 기본 키에 포함되어야 함
+    c.execute('''
+        SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'logs' AND CONSTRAINT_NAME = 'PRIMARY'
+    ''', (database.DB_CONFIG['database'],))
+    if 'timestamp' not in [row['COLUMN_NAME'] for row in c.fetchall()]:
+        c.execute("ALTER TABLE logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)")
+    c.execute(f"ALTER TABLE logs PARTITION BY RANGE COLUMNS(timestamp) ({_partition_clause(start_date, end_date)})")
+    conn.commit()
+    print("logs 테이블 일별 파티션 변환 완료")
+    return True
+
+
+def ensure_future_partitions(conn):
+    # pmax 를 쪼개서 앞으로 며칠 치 파티션을 미리 생성
+    c = conn.cursor()
+    partitions = get_partitions(c)
+    if not partitions:
+        return
+    daily = [bound for name, bound in partitions if name != MAX_PARTITION]
+    end_date = (datetime.now() + timedelta(days=RETENTION_CONFIG['partition_ahead_days'])).strftime("%Y-%m-%d")
+    start_date = daily[-1] if daily else datetime.now().strftime("%Y-%m-%d")
+    if start_date > end_date:
+        return
+    c.execute(f"ALTER TABLE logs REORGANIZE PARTITION {MAX_PARTITION} INTO ({_partition_clause(start_date, end_date)})")
+    conn.commit()
+
+
+def archive_day(conn, date):
+    # 하루치 로그를 배치 단위로 읽어서 보관 파일에 쓰고 hot 테이블에서 제거
+    start, end = date, next_day(date)
+    batch_size = RETENTION_CONFIG['batch_size']
+
+    writer = archive.ArchiveWriter(date)
+    try:
+        # 서버 측 커서로 스트리밍 (하루치를 메모리에 올리지 않음)
+        stream = conn.cursor(pymysql.cursors.SSDictCursor)
+        stream.execute("SELECT * FROM logs WHERE timestamp >= %s AND timestamp < %s ORDER BY id", (start, end))
+        while True:
+            rows = stream.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                writer.write(row)
+        stream.close()
+        summary = writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    c = conn.cursor()
+    partitions = dict((bound, name) for name, bound in get_partitions(c))
+    name = partitions.get(end)
+    if name is not None and name != MAX_PARTITION:
+        # 이 날짜가 가장 오래된 데이터이므로 상한이 다음날인 파티션을 통째로 제거
+        c.execute(f"ALTER TABLE logs DROP PARTITION {name}")
+        conn.commit()
+    else:
+        while True:
+            c.execute("DELETE FROM logs WHERE timestamp >= %s AND timestamp < %s ORDER BY id LIMIT %s",
+                      (start, end, batch_size))
+            deleted = c.rowcount
+            conn.commit()
+            if deleted < batch_size:
+                break
+
+    print(f"로그 보관 완료: {date} ({summary['count']}건)")
+    return summary
+
+
+def run_retention():
+    # hot 기간을 벗어난 날짜를 오래된 순서대로 보관
+    cutoff = (datetime.now() - timedelta(days=RETENTION_CONFIG['hot_days'])).strftime("%Y-%m-%d")
+    archived = []
+    conn = database.get_connection()
+    try:
+        if RETENTION_CONFIG['partition']:
+            try:
+                setup_partitions(conn)
+                ensure_future_partitions(conn)
+            except Exception as e:
+                print(f"파티션 설정 오류 (배치 삭제로 진행): {e}")
+
+        c = conn.cursor()
+        while True:
+            c.execute("SELECT MIN(timestamp) AS oldest FROM logs")
+            oldest = c.fetchone()['oldest']
+            if not oldest or oldest[:10] >= cutoff:
+                break
+            archive_day(conn, oldest[:10])
+            archived.append(oldest[:10])
+    finally:
+        conn.close()
+    return archived
+
+
+def _worker():
+    while True:
+        try:
+            last_run['archived_days'] = run_retention()
+            last_run['error'] = None
+        except Exception as e:
+            last_run['error'] = str(e)
+            print(f"로그 보존 작업 오류: {e}")
+        last_run['time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        time.sleep(RETENTION_CONFIG['interval'])
+
+
+_thread = None
+
+def start_retention_worker():
+    global _thread
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_worker, name='log-retention', daemon=True)
+    _thread.start()
+
+
+def status():
+    return {
+        'config': RETENTION_CONFIG,
+        'last_run': last_run,
+        'archived_dates': archive.archived_dates()
+    }
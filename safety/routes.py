@@ -1,23 +1,35 @@
 import os
 import json
-from flask import render_template, Response, request, jsonify, current_app
+import threading
+from flask import render_template, Response, request, jsonify, current_app, url_for
 from werkzeug.utils import secure_filename
+from urllib.parse import quote, urlencode
 from . import ai_bp
-from .model import AIModel
+from .model import AIModel, normalize_source
+from .stream import is_live_source
 from . import database 
+from . import tuning
+from . import retention
+from .monitor import MonitorManager
+from .startup import timer
+from .library import VideoLibrary, is_video_file, save_stream
+from . import worker
+from .coordinator import Coordinator, WORKER_URLS, parse_worker_urls, open_stream, forward
+from .heatmap import heatmaps, Heatmap, LEVELS
 
 # 초기 모델 설정 (기본값: Nano)
 current_model = 'yolov8n-pose.pt'
 
-print("AI 시스템 초기화 중...")
+# [수정] 모델은 import 시점이 아니라 start_background()에서 백그라운드로 로딩
 ai_system = AIModel(current_model)
-print("AI 시스템 초기화 완료")
 
 # 경로 설정
 BASE_DIR = os.path.abspath(os.path.dirname(__file__)) 
 PROJECT_ROOT = os.path.dirname(BASE_DIR) 
 UPLOAD_FOLDER = os.path.join(PROJECT_ROOT, 'safety', 'static', 'uploads')
-CONFIG_FILE = os.path.join(PROJECT_ROOT, 'safety', 'config.json') 
+# 설정 파일 경로는 환경변수로 변경 가능 (부하 테스트 등에서 별도 설정 사용)
+CONFIG_FILE = os.environ.get('SAFETY_CONFIG_FILE', os.path.join(PROJECT_ROOT, 'safety', 'config.json'))
+THUMBNAIL_FOLDER = os.path.join(PROJECT_ROOT, 'safety', 'static', 'thumbnails')
 
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
@@ -47,6 +59,105 @@ def get_upload_folder():
         os.makedirs(folder)
     return folder
 
+# [추가] 업로드 영상 라이브러리 (DB 인덱스 + 백그라운드 메타데이터/썸네일 분석)
+library = VideoLibrary(get_upload_folder(), THUMBNAIL_FOLDER)
+
+# [추가] 설정 키 -> 실제 영상 소스 (웹캠 / 스트림 주소 / 업로드 파일)
+def resolve_source(source_key):
+    if source_key == 'webcam':
+        return 0
+    if source_key.startswith('http') or source_key.startswith('rtsp'):
+        return source_key
+    filepath = os.path.join(get_upload_folder(), source_key)
+    if os.path.exists(filepath):
+        return filepath
+    return None
+
+# [추가] 소스별 백그라운드 모니터링 (시청자가 없어도 감지/로그 기록)
+monitors = MonitorManager(ai_system, resolve_source)
+
+def start_monitoring():
+    monitors.start_all(load_config())
+
+# [추가] 같은 키의 모니터가 실제로 같은 영상을 처리 중일 때만 반환
+# (웹캠 번호가 다른 경우 등 키는 같아도 소스가 다르면 None)
+def active_monitor(source_key, source):
+    service = monitors.get(source_key)
+    if service is None or service.source != normalize_source(source):
+        return None
+    return service
+
+# [추가] 대시보드 미리보기 (모니터가 없는 소스)
+# 시청 중에 같은 소스의 모니터가 시작되면 (구역/감지 설정 저장 등) 모니터 스트림으로 전환
+# -> 소스 하나에 추론 파이프라인 하나만 실행
+def preview_frames():
+    source_key, source = ai_system.source_key, ai_system.source
+    frames = ai_system.generate_frames()
+    service = None
+    try:
+        for chunk in frames:
+            yield chunk
+            service = active_monitor(source_key, source)
+            if service is not None:
+                break
+    finally:
+        frames.close() # 영상/스트림 반환
+    if service is not None:
+        print(f"미리보기를 모니터 스트림으로 전환: {source_key}")
+        yield from service.stream()
+
+# [추가] 여러 워커에 소스를 나누어 배정 (SAFETY_ROLE=coordinator 일 때만)
+coordinator = Coordinator(parse_worker_urls(WORKER_URLS), load_config) if worker.is_coordinator() else None
+
+# [추가] 모델 로딩/워밍업 + 백그라운드 모니터링 시작 (서버는 바로 요청 처리 가능)
+def start_background():
+    heatmaps.start() # 감지 위치 히트맵 주기적 저장
+    if worker.is_worker():
+        # 워커: 소스는 코디네이터가 배정, 로그는 코디네이터가 수집
+        worker.enable_log_forwarding()
+        ai_system.start_loading()
+        return
+    library.start()
+    retention.start_retention_worker()
+    if coordinator is not None:
+        # 코디네이터: 모니터링은 워커가 담당 (모델은 미리보기 요청 시에만 로딩)
+        coordinator.start()
+        return
+    ai_system.start_loading()
+    start_monitoring()
+
+# 첫 요청 시각 기록 (기동 시간 측정용)
+@ai_bp.before_app_request
+def mark_first_request():
+    timer.mark('first_request')
+
+# [추가] 프로세스 생존 확인 (항상 200)
+@ai_bp.route('/health')
+def health():
+    return jsonify({'status': 'ok', 'startup': timer.report()})
+
+# [추가] 모델 준비 완료 여부 (준비 전 503)
+@ai_bp.route('/ready')
+def ready():
+    body = {
+        'model': ai_system.model_name,
+        'device': ai_system.device,
+        'startup': timer.report()
+    }
+    if ai_system.is_ready():
+        body['status'] = 'ready'
+        return jsonify(body)
+    body['status'] = 'error' if ai_system.load_error else 'loading'
+    body['error'] = ai_system.load_error
+    return jsonify(body), 503
+
+# 저장된 소스 설정을 백그라운드 모니터에도 반영
+def sync_monitor(source_key, config):
+    if coordinator is not None:
+        coordinator.apply_config(source_key, config.get(source_key, {}))
+        return
+    monitors.apply_config(source_key, config.get(source_key, {}))
+
 # 메인페이지 /ai 주소
 @ai_bp.route('/')
 def dashboard():
@@ -76,17 +187,58 @@ def get_stats():
         'sources': sources
     })
 
+# [추가] 소스별 감지 위치 히트맵 (로그를 다시 읽지 않고 메모리 누적값 반환)
+# - ?source=<설정 키>&level=danger|warning (level 이 없으면 전체 등급 합계)
+# - source 가 없으면 히트맵이 있는 소스 목록
+@ai_bp.route('/api/heatmap')
+def get_heatmap():
+    source_key = request.args.get('source')
+    level = request.args.get('level')
+    if level and level not in LEVELS:
+        return jsonify({'status': 'error', 'message': f'Unknown level: {level}'}), 400
+
+    if not source_key:
+        if coordinator is not None:
+            return jsonify({'sources': sorted(coordinator.desired_sources())})
+        return jsonify({'sources': heatmaps.sources()})
+
+    # 코디네이터 모드: 소스를 맡은 워커의 히트맵 전달
+    worker_url = coordinator.worker_for(source_key) if coordinator is not None else None
+    if worker_url is not None:
+        query = urlencode({'source': source_key, 'level': level or ''})
+        try:
+            status, headers, body = forward(f"{worker_url}/api/heatmap?{query}")
+        except Exception as e:
+            return jsonify({'status': 'error', 'message': f'Worker unavailable: {e}'}), 502
+        return Response(body, status=status, content_type=headers.get('Content-Type'))
+
+    heatmap = heatmaps.find(source_key)
+    if heatmap is None:
+        # 설정된 소스지만 아직 감지가 없으면 빈 히트맵
+        if source_key not in load_config() and source_key != ai_system.source_key:
+            return jsonify({'status': 'error', 'message': f'Unknown source: {source_key}'}), 404
+        heatmap = Heatmap(source_key)
+    return jsonify(heatmap.to_dict(level))
+
+# [추가] 로그 보존/보관 상태
+@ai_bp.route('/api/retention')
+def retention_status():
+    return jsonify(retention.status())
+
 # 모델 변경 요청 처리 (POST)
 @ai_bp.route('/model_update', methods=['POST'])
 def update_model():
     data = request.get_json()
     new_model = data.get('model')
+    int8 = data.get('int8') # CPU INT8 양자화 모델 사용 여부 (선택)
+    cascade = data.get('cascade') # 사람 감지 -> 구역 근처만 포즈 추론 (선택)
     
     if new_model:
         print(f"모델 변경 요청 받음: {new_model}")
         try:
-            ai_system.set_model(new_model)
-            return jsonify({'status': 'success', 'model': new_model})
+            ai_system.set_model(new_model, int8, cascade)
+            return jsonify({'status': 'success', 'model': new_model, 'int8': ai_system.int8,
+                            'cascade': ai_system.cascade})
         except Exception as e:
             return jsonify({'status': 'error', 'message': str(e)}), 500
     return jsonify({'status': 'error', 'message': 'No model specified'}), 400
@@ -99,96 +251,226 @@ def change_source():
     type = data.get('type') 
 
     if source is not None:
-        source_key = source 
-        
+        # 설정 불러오기
+        config = load_config()
+
         if type == 'file':
             upload_folder = get_upload_folder()
             filepath = os.path.join(upload_folder, source)
             
-            if os.path.exists(filepath):
-                ai_system.set_source(filepath, source_key) 
-            else:
+            if not os.path.exists(filepath):
                 return jsonify({'status': 'error', 'message': f'File not found: {filepath}'}), 404
+            source_key = source
+            source_config = config.get(source_key)
+            # [수정] 구역/감지/표시/규칙/입력 크기를 스냅샷 하나로 한 번에 적용
+            ai_system.set_source(filepath, source_key, source_config)
         else:
-            ai_system.set_source(source, 'webcam') 
-            source_key = 'webcam'
+            # [수정] 스트림 주소는 주소 자체를 설정 키로 사용 (웹캠 설정과 섞이지 않도록)
+            source_key = source if is_live_source(source) else 'webcam'
+            source_config = config.get(source_key)
+            ai_system.set_source(source, source_key, source_config)
 
-        # 설정 불러오기
-        config = load_config()
-        source_config = config.get(source_key)
-        
-        if source_config:
-            # 구역 설정 적용
-            ai_system.set_zones(source_config.get('zones', []), 
-                                source_config.get('expand_ratio', 0), 
-                                source_config.get('canvas_size'))
-            # 감지 설정 적용
-            ai_system.set_detect_config(
-                source_config.get('conf', 0.5),
-                source_config.get('height_limit', 0),
-                source_config.get('elbow_angle', 0),
-                source_config.get('reach_enabled', False),
-                source_config.get('fall_enabled', False)
-            )
-            # 화면 표시 설정 적용
-            ai_system.detector.update_display_config(
-                source_config.get('draw_objects', True),
-                source_config.get('draw_zones', True),
-                source_config.get('show_only_alert', False)
-            )
-            
-            return jsonify({'status': 'success', 'source': source, 'config': source_config})
-        else:
-            # 초기화
-            ai_system.set_zones([], 0)
-            ai_system.set_detect_config(0.5, 0, 0, False, False)
-            ai_system.detector.update_display_config(True, True, False)
-            return jsonify({'status': 'success', 'source': source, 'config': None})
+        return jsonify({'status': 'success', 'source': source, 'config': source_config or None})
 
     return jsonify({'status': 'error', 'message': 'No source provided'}), 400
 
 # 비디오 파일 업로드 및 소스 변경
+# - multipart 'file' 필드 또는 ?filename=<이름> + 요청 본문(raw) 모두 지원
+# - 청크 단위로 디스크에 저장하고 메타데이터 분석은 백그라운드에서 수행
 @ai_bp.route('/upload_video', methods=['POST'])
 def upload_video():
-    if 'file' not in request.files:
-        return jsonify({'status': 'error', 'message': 'No file part'}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
+    if 'filename' in request.args:
+        filename = request.args.get('filename')
+        stream = request.stream
+    else:
+        if 'file' not in request.files:
+            return jsonify({'status': 'error', 'message': 'No file part'}), 400
+        file = request.files['file']
+        filename = file.filename
+        stream = file.stream
+
+    if not filename:
         return jsonify({'status': 'error', 'message': 'No selected file'}), 400
-        
-    if file:
-        filename = secure_filename(file.filename)
-        upload_folder = get_upload_folder()
-        filepath = os.path.join(upload_folder, filename)
-        file.save(filepath)
-        
-        ai_system.set_source(filepath, filename) 
-        
-        # 초기화
-        ai_system.set_zones([], 0)
-        ai_system.set_detect_config(0.5, 0, 0, False, False)
-        ai_system.detector.update_display_config(True, True, False)
-        
-        return jsonify({'status': 'success', 'source': filename})
 
-# 업로드된 비디오 목록 반환
-@ai_bp.route('/get_videos')
-def get_videos():
-    videos = []
+    filename = secure_filename(filename)
+    if not is_video_file(filename):
+        return jsonify({'status': 'error', 'message': 'Unsupported file type'}), 400
+
     upload_folder = get_upload_folder()
+    filepath = os.path.join(upload_folder, filename)
+    try:
+        save_stream(stream, filepath)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+    library.add(filename)
     
-    if os.path.exists(upload_folder):
-        for filename in os.listdir(upload_folder):
-            if filename.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
-                videos.append(filename)
+    # 새 영상은 기본 설정으로 시작
+    ai_system.set_source(filepath, filename) 
     
-    return jsonify({'videos': videos})
+    return jsonify({'status': 'success', 'source': filename})
+
+# [추가] 추론 입력 크기 자동 튜닝 (현재 소스의 짧은 클립 재생)
+# [수정] 요청 안에서 실행하지 않고 백그라운드 스레드에서 수행 -> GET /auto_tune_imgsz/status 로 결과 확인
+tune_lock = threading.Lock()
+tune_job = {'status': 'idle'}
+
+def run_auto_tune(source_key, source, model_path, conf, device, params):
+    try:
+        frames = tuning.read_clip(source, params['frames'], params['stride'])
+        if not frames:
+            raise RuntimeError('Cannot read source')
+
+        # 스트리밍 중인 모델과 분리된 인스턴스로 측정 (INT8 사용 중이면 INT8 모델로)
+        model = tuning.load_model(model_path)
+        best, report = tuning.auto_tune_imgsz(model, frames,
+                                              conf=conf,
+                                              device=device,
+                                              candidates=params['candidates'],
+                                              tolerance=params['tolerance'],
+                                              min_recall=params['min_recall'])
+        if ai_system.source_key == source_key: # 튜닝 중에 소스가 바뀌었으면 설정 파일에만 저장
+            ai_system.set_imgsz(best)
+
+        config = load_config()
+        if source_key not in config: config[source_key] = {}
+        config[source_key]['imgsz'] = best
+        save_config(config)
+        sync_monitor(source_key, config)
+        result = {'status': 'success', 'imgsz': best, 'report': report}
+    except Exception as e:
+        print(f"imgsz 자동 튜닝 오류: {e}")
+        result = {'status': 'error', 'message': str(e)}
+
+    with tune_lock:
+        tune_job.update(result)
+
+@ai_bp.route('/auto_tune_imgsz', methods=['POST'])
+def auto_tune_imgsz():
+    data = request.get_json(silent=True) or {}
+    if not ai_system.is_ready():
+        return jsonify({'status': 'error', 'message': 'Model is not ready'}), 503
+
+    params = {
+        'frames': data.get('frames', 30),
+        'stride': data.get('stride', 5),
+        'candidates': data.get('candidates'),
+        'tolerance': data.get('tolerance', tuning.DEFAULT_TOLERANCE),
+        'min_recall': data.get('min_recall', tuning.DEFAULT_MIN_RECALL)
+    }
+    model_path = tuning.int8_model_path(ai_system.model_name) if ai_system.int8 else ai_system.model_name
+    source_key = ai_system.source_key
+
+    with tune_lock:
+        if tune_job['status'] == 'running':
+            return jsonify({'status': 'error', 'message': 'Tuning already running', 'source': tune_job.get('source')}), 409
+        tune_job.clear()
+        tune_job.update({'status': 'running', 'source': source_key, 'model': model_path})
+
+    threading.Thread(target=run_auto_tune, name='imgsz-tuner', daemon=True,
+                     args=(source_key, ai_system.source, model_path, ai_system.detector.config.conf,
+                           ai_system.device, params)).start()
+    return jsonify({'status': 'running', 'source': source_key, 'model': model_path}), 202
+
+# 자동 튜닝 진행 상태 (running / success / error, 완료 시 imgsz 와 report 포함)
+@ai_bp.route('/auto_tune_imgsz/status')
+def auto_tune_status():
+    with tune_lock:
+        return jsonify(dict(tune_job))
+
+# 업로드된 비디오 목록 반환 (인덱스에서 페이지 단위로 조회)
+@ai_bp.route('/get_videos')
+def get_videos():
+    page = max(1, request.args.get('page', default=1, type=int))
+    per_page = min(500, max(1, request.args.get('per_page', default=50, type=int)))
+
+    rows, total = library.list(page, per_page)
+    for row in rows:
+        if row.get('thumbnail'):
+            row['thumbnail_url'] = url_for('ai_safety.static', filename='thumbnails/' + row['thumbnail'])
+
+    return jsonify({
+        'videos': [row['filename'] for row in rows],
+        'items': rows,
+        'total': total,
+        'page': page,
+        'per_page': per_page
+    })
 
 # 실시간 비디오 스트리밍 경로
 @ai_bp.route('/video_feed')
 def video_feed():
-    return Response(ai_system.generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    # 백그라운드 모니터가 있는 소스는 구독만 함 (추론 파이프라인 중복 실행 방지)
+    source_key = request.args.get('source', ai_system.source_key)
+    # [추가] 코디네이터 모드: 소스를 맡은 워커의 스트림을 그대로 전달
+    worker_url = coordinator.worker_for(source_key) if coordinator is not None else None
+    if worker_url is not None:
+        try:
+            content_type, chunks = open_stream(f"{worker_url}/video_feed?source={quote(source_key, safe='')}")
+            return Response(chunks, content_type=content_type)
+        except Exception as e:
+            return jsonify({'status': 'error', 'message': f'Worker unavailable: {e}'}), 502
+    if source_key == ai_system.source_key:
+        # 현재 소스: 모니터가 같은 영상을 처리 중일 때만 구독
+        service = active_monitor(source_key, ai_system.source)
+    else:
+        service = monitors.get(source_key)
+    if service is not None:
+        return Response(service.stream(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    if source_key != ai_system.source_key:
+        return jsonify({'status': 'error', 'message': f'Unknown source: {source_key}'}), 404
+    return Response(preview_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+# [추가] 최신 프레임 스냅샷 (모니터링 중인 소스, 스트림 연결 없이 폴링용)
+# - ?width=<픽셀> 이면 축소 이미지 (카메라 여러 대 개요 화면용)
+# - ETag / If-None-Match 지원: 프레임이 바뀌지 않았으면 304 (본문 없음)
+SNAPSHOT_MAX_WIDTH = 1920
+
+@ai_bp.route('/snapshot/<path:source_key>')
+def snapshot(source_key):
+    width = request.args.get('width', type=int)
+    if width is not None:
+        width = max(16, min(width, SNAPSHOT_MAX_WIDTH))
+
+    worker_url = coordinator.worker_for(source_key) if coordinator is not None else None
+    if worker_url is not None:
+        query = f"?width={width}" if width else ''
+        headers = {'If-None-Match': request.headers['If-None-Match']} if 'If-None-Match' in request.headers else {}
+        try:
+            status, resp_headers, body = forward(f"{worker_url}/snapshot/{quote(source_key, safe='')}{query}", headers)
+        except Exception as e:
+            return jsonify({'status': 'error', 'message': f'Worker unavailable: {e}'}), 502
+        response = Response(body, status=status, content_type=resp_headers.get('Content-Type'))
+        for name in ('ETag', 'Cache-Control'):
+            if resp_headers.get(name):
+                response.headers[name] = resp_headers.get(name)
+        return response
+
+    service = monitors.get(source_key)
+    if service is None:
+        return jsonify({'status': 'error', 'message': f'Not monitored: {source_key}'}), 404
+
+    seq, jpeg, frame = service.snapshot()
+    if seq is None:
+        return jsonify({'status': 'error', 'message': 'No frame yet'}), 503
+
+    etag = service.snapshot_etag(seq, width)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        if width and frame is not None and width < frame.shape[1]:
+            jpeg = service.thumbnail(seq, frame, width) or jpeg
+        response = Response(jpeg, mimetype='image/jpeg')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache' # 매번 ETag 로 재검증
+    return response
+
+# [추가] 백그라운드 모니터링 상태
+@ai_bp.route('/monitor_status')
+def monitor_status():
+    if coordinator is not None:
+        return jsonify({'monitors': [], 'coordinator': coordinator.status()})
+    return jsonify({'monitors': monitors.status()})
 
 # 감지 신뢰도 변경 (단독 호출용, 필요시 유지)
 @ai_bp.route('/update_conf', methods=['POST'])
@@ -224,6 +506,7 @@ def update_zones():
             config[source_key]['expand_ratio'] = expand_ratio
             config[source_key]['canvas_size'] = canvas_size
             save_config(config)
+            sync_monitor(source_key, config)
             
             return jsonify({'status': 'success', 'message': 'Zones saved'})
         except Exception as e:
@@ -255,11 +538,33 @@ def update_detect_config():
         config[source_key]['reach_enabled'] = data.get('reach_enabled')
         config[source_key]['fall_enabled'] = data.get('fall_enabled')
         save_config(config)
+        sync_monitor(source_key, config)
         
         return jsonify({'status': 'success', 'message': 'Detect config saved'})
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+# [추가] 선언형 감지 규칙 업데이트
+@ai_bp.route('/update_rules', methods=['POST'])
+def update_rules():
+    data = request.get_json()
+    rules = data.get('rules')
+    if rules is None:
+        return jsonify({'status': 'error', 'message': 'No rules data'}), 400
+    try:
+        ai_system.detector.update_rules(rules)
+
+        config = load_config()
+        source_key = ai_system.source_key
+        if source_key not in config: config[source_key] = {}
+        config[source_key]['rules'] = rules
+        save_config(config)
+        sync_monitor(source_key, config)
+
+        return jsonify({'status': 'success', 'compiled': [r.name for r in ai_system.detector.config.rules]})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 # 화면 표시 설정 업데이트
 @ai_bp.route('/update_display_config', methods=['POST'])
 def update_display_config():
@@ -279,6 +584,7 @@ def update_display_config():
         config[source_key]['draw_zones'] = draw_zones
         config[source_key]['show_only_alert'] = show_only_alert
         save_config(config)
+        sync_monitor(source_key, config)
         
         return jsonify({'status': 'success', 'message': 'Display config saved'})
     except Exception as e:
@@ -287,5 +593,54 @@ def update_display_config():
 # 로그 가져오기 API
 @ai_bp.route('/get_logs')
 def get_logs():
-    logs = ai_system.detector.get_logs()
+    source_key = request.args.get('source', ai_system.source_key)
+    worker_url = coordinator.worker_for(source_key) if coordinator is not None else None
+    if worker_url is not None:
+        try:
+            content_type, chunks = open_stream(f"{worker_url}/get_logs?source={quote(source_key, safe='')}")
+            return Response(b''.join(chunks), content_type=content_type)
+        except Exception as e:
+            return jsonify({'logs': [], 'error': str(e)}), 502
+    service = monitors.get(source_key)
+    detector = service.detector if service is not None else ai_system.detector
+    logs = detector.get_logs()
     return jsonify({'logs': logs})
+
+# ---- [추가] 워커 노드 API (SAFETY_ROLE=worker) ----
+
+# 워커가 아니면 404, 코디네이터가 보낸 요청이 아니면 403
+def worker_guard():
+    if not worker.is_worker():
+        return jsonify({'status': 'error', 'message': 'Not a worker'}), 404
+    if not worker.is_authorized(request.remote_addr, request.headers.get(worker.TOKEN_HEADER)):
+        return jsonify({'status': 'error', 'message': 'Forbidden'}), 403
+    return None
+
+# 코디네이터가 배정한 소스 목록 적용 {'sources': {설정 키: 설정}}
+@ai_bp.route('/worker/assign', methods=['POST'])
+def worker_assign():
+    denied = worker_guard()
+    if denied is not None:
+        return denied
+    data = request.get_json()
+    started = worker.assign(monitors, data.get('sources', {}))
+    return jsonify({'status': 'success', 'running': started})
+
+# 부하(CPU) / 소스별 처리 현황
+@ai_bp.route('/worker/status')
+def worker_status():
+    denied = worker_guard()
+    if denied is not None:
+        return denied
+    return jsonify(worker.status(monitors, ai_system))
+
+# 순번 since 이후의 감지 로그 (코디네이터가 중앙 DB로 수집, since 이하는 저장 완료로 보고 삭제)
+@ai_bp.route('/worker/events')
+def worker_events():
+    denied = worker_guard()
+    if denied is not None:
+        return denied
+    since = request.args.get('since', default=0, type=int)
+    limit = request.args.get('limit', default=1000, type=int)
+    events, seq = worker.outbox.since(since, limit)
+    return jsonify({'events': events, 'seq': seq, 'boot_id': worker.BOOT_ID})
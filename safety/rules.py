@@ -0,0 +1,290 @@
+import numpy as np
+
+# 선언형 감지 규칙 (config.json 소스별 'rules')
+#
+# "rules": [
+#     {
+#         "name": "hands_up",
+#         "level": "warning",
+#         "message": "손 들기 감지",
+#         "when": {"and": [
+#             {"keypoint": "left_wrist", "axis": "y", "op": "<", "ref": "nose"},
+#             {"angle": ["left_shoulder", "left_elbow", "left_wrist"], "op": ">=", "value": 150},
+#             {"or": [
+#                 {"ratio": ["box_w", "box_h"], "op": ">", "value": 1.2},
+#                 {"zone": "red", "keypoints": ["left_wrist", "right_wrist"], "zone_type": "touch"}
+#             ]}
+#         ]}
+#     }
+# ]
+#
+# 규칙은 설정 로드 시 한 번 컴파일되며, 평가는 감지된 모든 사람에 대해
+# (N,) bool 배열로 한 번에 수행됩니다.
+
+KEYPOINT_NAMES = [
+    'nose', 'left_eye', 'right_eye', 'left_ear', 'right_ear',
+    'left_shoulder', 'right_shoulder', 'left_elbow', 'right_elbow',
+    'left_wrist', 'right_wrist', 'left_hip', 'right_hip',
+    'left_knee', 'right_knee', 'left_ankle', 'right_ankle'
+]
+
+OPS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+    '==': np.equal,
+    '!=': np.not_equal
+}
+
+DEFAULT_MIN_CONF = 0.1
+LEVELS = ('danger', 'warning')
+
+
+class RuleError(ValueError):
+    pass
+
+
+def keypoint_index(key):
+    if isinstance(key, int) and 0 <= key < 17:
+        return key
+    if isinstance(key, str):
+        if key.isdigit() and int(key) < 17:
+            return int(key)
+        if key in KEYPOINT_NAMES:
+            return KEYPOINT_NAMES.index(key)
+    raise RuleError(f"알 수 없는 키포인트: {key}")
+
+
+def points_in_polygon(points, poly):
+    # 짝수-홀수 규칙 기반 point-in-polygon (points: (P, 2), poly: (M, 2))
+    # 외곽선 위의 점도 안쪽으로 판정 (cv2.pointPolygonTest(...) >= 0 과 동일)
+    if len(points) == 0:
+        return np.zeros((0,), bool)
+    x = points[:, 0][:, None]
+    y = points[:, 1][:, None]
+    x1 = poly[:, 0][None, :]
+    y1 = poly[:, 1][None, :]
+    x2 = np.roll(poly[:, 0], -1)[None, :]
+    y2 = np.roll(poly[:, 1], -1)[None, :]
+
+    crosses = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = (x2 - x1) * (y - y1) / (y2 - y1) + x1
+    inside = crosses & (x < x_cross)
+
+    # 변 위의 점: 두 끝점과 일직선(외적 0)이고 변의 범위 안
+    on_line = (x2 - x1) * (y - y1) == (y2 - y1) * (x - x1)
+    on_edge = on_line & (np.minimum(x1, x2) <= x) & (x <= np.maximum(x1, x2)) & \
+              (np.minimum(y1, y2) <= y) & (y <= np.maximum(y1, y2))
+    return (np.count_nonzero(inside, axis=1) % 2 == 1) | on_edge.any(axis=1)
+
+
+def joint_angles(kpts, a, b, c):
+    # 모든 사람의 관절 각도 (도 단위, 0~180)
+    pa, pb, pc = kpts[:, a, :2], kpts[:, b, :2], kpts[:, c, :2]
+    radians = np.arctan2(pc[:, 1] - pb[:, 1], pc[:, 0] - pb[:, 0]) - \
+              np.arctan2(pa[:, 1] - pb[:, 1], pa[:, 0] - pb[:, 0])
+    angle = np.abs(radians * 180.0 / np.pi)
+    return np.where(angle > 180.0, 360.0 - angle, angle)
+
+
+class RuleContext:
+    # 한 프레임의 평가 입력 (공통 계산값은 캐시해서 규칙끼리 공유)
+    def __init__(self, keypoints, boxes, zones, conf):
+        self.kpts = keypoints   # (N, 17, 3)
+        self.boxes = boxes      # (N, 4)
+        self.zones = zones      # 스케일 적용된 구역 목록 (red_pts / yellow_pts)
+        self.conf = conf
+        self.n = len(keypoints)
+        self._cache = {}
+
+    def cached(self, key, fn):
+        if key not in self._cache:
+            self._cache[key] = fn()
+        return self._cache[key]
+
+    def visible(self, idx, min_conf):
+        return self.kpts[:, idx, 2] >= min_conf
+
+
+# --- 피처 (사람별 스칼라 값, 계산 불가 시 NaN) ---
+
+def _feature(name, min_conf):
+    if name in ('box_w', 'box_h', 'box_area', 'box_x', 'box_y'):
+        def box_feature(ctx):
+            b = ctx.boxes
+            if len(b) != ctx.n:
+                return np.full(ctx.n, np.nan)
+            w = b[:, 2] - b[:, 0]
+            h = b[:, 3] - b[:, 1]
+            return {'box_w': w, 'box_h': h, 'box_area': w * h,
+                    'box_x': (b[:, 0] + b[:, 2]) / 2, 'box_y': (b[:, 1] + b[:, 3]) / 2}[name]
+        return box_feature
+
+    if name == 'torso':
+        def torso(ctx):
+            def compute():
+                k = ctx.kpts
+                sh_vis = k[:, [5, 6], 2] >= min_conf
+                hip_vis = k[:, [11, 12], 2] >= min_conf
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    sh = np.sum(k[:, [5, 6], 1] * sh_vis, axis=1) / np.sum(sh_vis, axis=1)
+                    hip = np.sum(k[:, [11, 12], 1] * hip_vis, axis=1) / np.sum(hip_vis, axis=1)
+                return hip - sh
+            return ctx.cached(('torso', min_conf), compute)
+        return torso
+
+    if '.' in name:
+        kpt, axis = name.rsplit('.', 1)
+        return _keypoint_value(keypoint_index(kpt), axis, min_conf)
+
+    raise RuleError(f"알 수 없는 피처: {name}")
+
+
+def _keypoint_value(idx, axis, min_conf):
+    if axis not in ('x', 'y', 'conf'):
+        raise RuleError(f"알 수 없는 축: {axis}")
+    col = {'x': 0, 'y': 1, 'conf': 2}[axis]
+
+    def value(ctx):
+        v = ctx.kpts[:, idx, col].astype(np.float64)
+        if axis == 'conf':
+            return v
+        return np.where(ctx.visible(idx, min_conf), v, np.nan)
+    return value
+
+
+def _compare(fn, node):
+    op = OPS.get(node.get('op', '>='))
+    if op is None:
+        raise RuleError(f"알 수 없는 연산자: {node.get('op')}")
+    if 'value' in node:
+        threshold = float(node['value'])
+        rhs = lambda ctx: threshold
+    elif 'ref' in node:
+        rhs = _keypoint_value(keypoint_index(node['ref']), node.get('axis', 'y'),
+                              float(node.get('min_conf', DEFAULT_MIN_CONF)))
+    else:
+        raise RuleError("비교 대상('value' 또는 'ref')이 없습니다")
+
+    def evaluate(ctx):
+        lhs = fn(ctx)
+        right = rhs(ctx)
+        with np.errstate(invalid='ignore'):
+            out = op(lhs, right)
+        # NaN(계산 불가)은 양쪽 모두 항상 False ('!=' 도 포함)
+        return out & ~np.isnan(lhs) & ~np.isnan(right)
+    return evaluate
+
+
+def _compile_node(node):
+    if not isinstance(node, dict):
+        raise RuleError(f"잘못된 규칙 노드: {node}")
+
+    if 'and' in node or 'or' in node:
+        is_and = 'and' in node
+        children = [_compile_node(child) for child in node['and' if is_and else 'or']]
+        if not children:
+            raise RuleError("빈 and/or 노드")
+
+        def combine(ctx):
+            out = children[0](ctx)
+            for child in children[1:]:
+                out = (out & child(ctx)) if is_and else (out | child(ctx))
+            return out
+        return combine
+
+    if 'not' in node:
+        child = _compile_node(node['not'])
+        return lambda ctx: ~child(ctx)
+
+    min_conf = float(node.get('min_conf', DEFAULT_MIN_CONF))
+
+    if 'keypoint' in node:
+        return _compare(_keypoint_value(keypoint_index(node['keypoint']), node.get('axis', 'y'), min_conf), node)
+
+    if 'feature' in node:
+        return _compare(_feature(node['feature'], min_conf), node)
+
+    if 'angle' in node:
+        a, b, c = [keypoint_index(k) for k in node['angle']]
+
+        def angle(ctx):
+            values = ctx.cached(('angle', a, b, c), lambda: joint_angles(ctx.kpts, a, b, c))
+            vis = ctx.visible(a, min_conf) & ctx.visible(b, min_conf) & ctx.visible(c, min_conf)
+            return np.where(vis, values, np.nan)
+        return _compare(angle, node)
+
+    if 'ratio' in node:
+        num, den = [_feature(name, min_conf) for name in node['ratio']]
+
+        def ratio(ctx):
+            with np.errstate(invalid='ignore', divide='ignore'):
+                r = num(ctx) / den(ctx)
+            return np.where(np.isfinite(r), r, np.nan)
+        return _compare(ratio, node)
+
+    if 'zone' in node:
+        which = node['zone']
+        if which not in ('red', 'yellow', 'any'):
+            raise RuleError(f"알 수 없는 구역 종류: {which}")
+        indices = [keypoint_index(k) for k in node.get('keypoints', range(17))]
+        zone_type = node.get('zone_type')
+        zone_id = node.get('zone_id')
+        kpt_conf = node.get('min_conf')
+
+        def in_zone(ctx):
+            hit = np.zeros(ctx.n, bool)
+            if ctx.n == 0:
+                return hit
+            pts = ctx.kpts[:, indices, :2].reshape(-1, 2)
+            vis = (ctx.kpts[:, indices, 2] >= (ctx.conf if kpt_conf is None else float(kpt_conf))).reshape(-1)
+            for zone in ctx.zones:
+                if zone_type and zone.get('type') != zone_type:
+                    continue
+                if zone_id is not None and zone.get('id') != zone_id:
+                    continue
+                polys = []
+                if which in ('red', 'any'):
+                    polys.append(zone['red_pts'])
+                if which in ('yellow', 'any') and zone.get('yellow_pts') is not None:
+                    polys.append(zone['yellow_pts'])
+                for poly in polys:
+                    inside = points_in_polygon(pts, poly.reshape(-1, 2).astype(np.float64)) & vis
+                    hit |= inside.reshape(ctx.n, len(indices)).any(axis=1)
+            return hit
+        return in_zone
+
+    raise RuleError(f"알 수 없는 규칙 노드: {node}")
+
+
+class CompiledRule:
+    def __init__(self, name, level, message, evaluate):
+        self.name = name
+        self.level = level
+        self.message = message
+        self.evaluate = evaluate
+
+
+def compile_rules(rule_defs):
+    # 설정의 규칙 목록 -> CompiledRule 목록 (잘못된 규칙은 건너뜀)
+    compiled = []
+    for i, rule in enumerate(rule_defs or []):
+        name = rule.get('name', f'rule_{i + 1}') if isinstance(rule, dict) else f'rule_{i + 1}'
+        try:
+            if not isinstance(rule, dict) or 'when' not in rule:
+                raise RuleError("'when' 조건이 없습니다")
+            level = rule.get('level', 'warning')
+            if level not in LEVELS:
+                raise RuleError(f"알 수 없는 레벨: {level}")
+            message = rule.get('message', f"규칙 감지 ({name})")
+            compiled.append(CompiledRule(name, level, message, _compile_node(rule['when'])))
+        except RuleError as e:
+            print(f"규칙 컴파일 오류 [{name}]: {e}")
+    return compiled
+
+
+def evaluate_rules(rules, ctx):
+    # 규칙별 (N,) bool 마스크
+    return [(rule, rule.evaluate(ctx)) for rule in rules]
@@ -0,0 +1,20 @@
+import time
+
+# 기동 시간 측정 (프로세스 시작 -> 첫 요청 / 모델 준비 / 첫 추론 프레임)
+class StartupTimer:
+    def __init__(self):
+        self.start = time.time()
+        self.marks = {}
+
+    def mark(self, name):
+        # 이벤트별 최초 시각만 기록
+        if name in self.marks:
+            return
+        self.marks[name] = time.time()
+        print(f"[기동] {name}: {self.marks[name] - self.start:.2f}초")
+
+    def report(self):
+        return {name: round(t - self.start, 3) for name, t in self.marks.items()}
+
+
+timer = StartupTimer()
@@ -42,7 +42,7 @@ function resizeCanvas() {
 }
 
 function loadVideoList() {
-    fetch('/get_videos')
+    fetch('/get_videos?per_page=500')
     .then(response => response.json())
     .then(data => {
         const select = document.getElementById('videoSelect');
@@ -524,12 +524,11 @@ window.uploadVideo = function() {
         return;
     }
 
-    const formData = new FormData();
-    formData.append('file', file);
-
-    fetch('/upload_video', {
+    // 파일을 요청 본문으로 그대로 전송 (서버에서 청크 단위로 저장)
+    fetch('/upload_video?filename=' + encodeURIComponent(file.name), {
         method: 'POST',
-        body: formData
+        headers: {'Content-Type': 'application/octet-stream'},
+        body: file
     })
     .then(response => response.json())
     .then(data => {
@@ -0,0 +1,247 @@
+import sys
+import time
+import threading
+import cv2
+
+# 실시간 스트림(http / rtsp) 전용 읽기 스레드
+# - OpenCV 내부 버퍼에 쌓인 프레임을 순서대로 처리하면 추론이 느릴 때 실시간보다 점점 뒤처짐
+#   -> 읽기 스레드가 계속 읽으면서 최신 프레임 하나만 보관 (처리하지 못한 프레임은 버림)
+# - 연결이 끊기면 지수 백오프로 재연결 (사용하는 쪽의 시청자 연결은 유지)
+# - 같은 소스를 여러 곳(모니터 / 대시보드 미리보기)에서 써도 연결은 하나만 사용
+
+BACKOFF_INITIAL = 0.5   # 첫 재연결 대기 (초)
+BACKOFF_MAX = 30.0      # 최대 재연결 대기 (초)
+READ_TIMEOUT = 1.0      # 새 프레임 대기 시간 (초, 넘으면 read() 실패 반환)
+
+
+def is_live_source(src):
+    return isinstance(src, str) and (src.startswith('http') or src.startswith('rtsp'))
+
+
+class LiveStreamReader:
+    def __init__(self, source, simulate_realtime=False, opener=None):
+        self.source = source
+        self.opener = opener or cv2.VideoCapture # 테스트에서는 가짜 캡처로 교체
+        # 테스트용: 파일을 원본 FPS 속도로 읽어서 실시간 카메라처럼 사용 (끝나면 끊긴 것으로 처리)
+        self.simulate_realtime = simulate_realtime
+
+        self.cond = threading.Condition()
+        self.frame = None
+        self.capture_time = 0.0
+        self.seq = 0
+        self.taken = True # 최신 프레임을 누군가 가져갔는지 (버린 프레임 집계용)
+        self.fps = None
+
+        # 상태 정보
+        self.connected = False
+        self.connects = 0
+        self.reconnects = 0
+        self.open_failures = 0
+        self.frames_read = 0
+        self.frames_dropped = 0
+        self.lag = 0.0 # 마지막으로 가져간 프레임의 캡처 후 경과 시간 (초)
+        self.backoff = 0.0
+        self.last_error = None
+
+        self.running = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name=f"stream-{self.source}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.stop_event.set()
+        with self.cond:
+            self.cond.notify_all()
+
+    def read(self, last_seq, timeout=None):
+        # last_seq 이후의 최신 프레임 -> (프레임, 캡처 시각, 순번) (없으면 None)
+        if timeout is None:
+            timeout = READ_TIMEOUT
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq != last_seq or not self.running, timeout=timeout)
+            if self.seq == last_seq or self.frame is None:
+                return None
+            self.taken = True
+            self.lag = time.time() - self.capture_time
+            return self.frame, self.capture_time, self.seq
+
+    def status(self):
+        return {
+            'source': self.source,
+            'connected': self.connected,
+            'reconnects': self.reconnects,
+            'open_failures': self.open_failures,
+            'frames_read': self.frames_read,
+            'frames_dropped': self.frames_dropped,
+            'lag_ms': round(self.lag * 1000, 1),
+            'age_ms': round((time.time() - self.capture_time) * 1000, 1) if self.capture_time else None,
+            'backoff': self.backoff,
+            'last_error': self.last_error
+        }
+
+    def _store(self, frame):
+        with self.cond:
+            if not self.taken:
+                self.frames_dropped += 1
+            self.frame = frame
+            self.capture_time = time.time()
+            self.seq += 1
+            self.taken = False
+            self.frames_read += 1
+            self.cond.notify_all()
+
+    def _open(self):
+        cap = self.opener(self.source)
+        if cap.isOpened():
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1) # 지원하는 백엔드에서는 내부 버퍼 최소화
+        return cap
+
+    def _run(self):
+        backoff = BACKOFF_INITIAL
+        while self.running:
+            cap = self._open()
+            if cap.isOpened():
+                self.connected = True
+                self.connects += 1
+                if self.connects > 1:
+                    self.reconnects += 1
+                    print(f"[스트림] 재연결 성공: {self.source} ({self.reconnects}회)")
+                fps = cap.get(cv2.CAP_PROP_FPS)
+                self.fps = fps if fps and fps > 0 else None
+                interval = 1.0 / self.fps if self.simulate_realtime and self.fps else 0
+
+                while self.running:
+                    start = time.time()
+                    success, frame = cap.read()
+                    if not success:
+                        self.last_error = 'stream ended'
+                        break
+                    self._store(frame)
+                    backoff = BACKOFF_INITIAL # 프레임이 들어오면 백오프 초기화
+                    self.backoff = 0.0
+                    if interval:
+                        delay = interval - (time.time() - start)
+                        if delay > 0:
+                            self.stop_event.wait(delay)
+                self.connected = False
+            else:
+                self.last_error = 'open failed'
+                self.open_failures += 1
+            cap.release()
+
+            if not self.running:
+                break
+            print(f"[스트림] 연결 끊김: {self.source} ({self.last_error}, {backoff:.1f}초 후 재시도)")
+            self.backoff = backoff
+            self.stop_event.wait(backoff)
+            backoff = min(backoff * 2, BACKOFF_MAX)
+
+
+class StreamHandle:
+    # cv2.VideoCapture 와 같은 방식으로 사용 (read / get / isOpened / release)
+    # 사용하는 쪽마다 하나씩 (마지막으로 읽은 프레임 순번을 따로 관리)
+    def __init__(self, pool, reader):
+        self.pool = pool
+        self.reader = reader
+        self.last_seq = 0
+        self.capture_time = 0.0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released
+
+    def read(self, timeout=None):
+        # 새 프레임이 없으면 (재연결 중 등) timeout 후 (False, None)
+        result = self.reader.read(self.last_seq, timeout)
+        if result is None:
+            return False, None
+        frame, self.capture_time, self.last_seq = result
+        return True, frame.copy() # 여러 곳에서 같은 프레임에 그리지 않도록 복사본 사용
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.reader.fps or 0
+        return 0
+
+    def status(self):
+        return self.reader.status()
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.pool.release(self.reader)
+
+
+class ReaderPool:
+    # 소스별 읽기 스레드 공유 (사용하는 곳이 없어지면 중지)
+    def __init__(self, opener=None):
+        self.readers = {}
+        self.refs = {}
+        self.lock = threading.Lock()
+        self.opener = opener
+
+    def acquire(self, source, simulate_realtime=False):
+        with self.lock:
+            reader = self.readers.get(source)
+            if reader is None:
+                reader = LiveStreamReader(source, simulate_realtime, self.opener)
+                self.readers[source] = reader
+                self.refs[source] = 0
+                reader.start()
+            self.refs[source] += 1
+        return StreamHandle(self, reader)
+
+    def release(self, reader):
+        with self.lock:
+            self.refs[reader.source] -= 1
+            if self.refs[reader.source] > 0:
+                return
+            del self.refs[reader.source]
+            del self.readers[reader.source]
+        reader.stop()
+
+    def status(self, source=None):
+        if source is not None:
+            reader = self.readers.get(source)
+            return reader.status() if reader is not None else None
+        return [reader.status() for reader in list(self.readers.values())]
+
+
+readers = ReaderPool()
+
+
+# 수동 확인용: 파일을 실시간 스트림처럼 읽거나 (--simulate) 실제/루프백 스트림 주소를 읽으면서
+# 일부러 느리게 처리했을 때의 지연/버린 프레임/재연결 수를 출력
+#   python -m safety.stream safety/static/uploads/CCTV1.mp4 --simulate
+#   python -m safety.stream "http://127.0.0.1:5000/video_feed?source=CCTV1.mp4"
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not args:
+        print("사용법: python -m safety.stream <소스> [--simulate] [--work-ms=200]")
+        sys.exit(1)
+    work = 0.2
+    for a in sys.argv[1:]:
+        if a.startswith('--work-ms='):
+            work = float(a.split('=', 1)[1]) / 1000
+    handle = readers.acquire(args[0], simulate_realtime='--simulate' in sys.argv)
+    try:
+        last_report = time.time()
+        while True:
+            success, frame = handle.read()
+            if success:
+                time.sleep(work) # 느린 추론 흉내
+            if time.time() - last_report >= 1.0:
+                print(handle.status())
+                last_report = time.time()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        handle.release()
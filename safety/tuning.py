@@ -0,0 +1,167 @@
+import os
+import time
+import cv2
+import numpy as np
+from .pose import PoseResult
+
+# 자동 튜닝 후보 입력 크기 (YOLO stride 32의 배수)
+IMGSZ_CANDIDATES = [320, 384, 448, 512, 576, 640, 768, 960, 1280]
+
+# 기준 대비 허용 오차 (키포인트 거리 / 박스 대각선 길이)
+DEFAULT_TOLERANCE = 0.05
+# 기준 대비 최소 사람 검출률
+DEFAULT_MIN_RECALL = 0.95
+
+# INT8 보정(calibration)용 데이터셋 (ultralytics 내장)
+INT8_CALIB_DATA = 'coco8-pose.yaml'
+
+
+def int8_model_path(model_path):
+    # yolov8n-pose.pt -> yolov8n-pose_int8_openvino_model
+    base, _ = os.path.splitext(model_path)
+    return f"{base}_int8_openvino_model"
+
+
+def load_model(model_path):
+    from ultralytics import YOLO
+    return YOLO(model_path, task='pose')
+
+
+def export_int8(model_path):
+    # OpenVINO INT8 양자화 모델 생성 (CPU 전용)
+    target = int8_model_path(model_path)
+    if os.path.exists(target):
+        return target
+
+    model = load_model(model_path)
+    exported = model.export(format='openvino', int8=True, dynamic=True, data=INT8_CALIB_DATA)
+    exported = str(exported).rstrip('/\\')
+    if os.path.abspath(exported) != os.path.abspath(target):
+        os.replace(exported, target)
+    return target
+
+
+def read_clip(source, num_frames=30, stride=5):
+    # 튜닝용 짧은 클립 읽기 (stride 프레임 간격으로 샘플링)
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        return []
+
+    frames = []
+    index = 0
+    while len(frames) < num_frames:
+        success, frame = cap.read()
+        if not success:
+            break
+        if index % stride == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def run_clip(model, frames, imgsz, conf, device):
+    # 클립 전체 추론 -> (프레임별 결과, 프레임당 평균 ms)
+    outputs = []
+    if frames:
+        model(frames[0], verbose=False, device=device, conf=conf, imgsz=imgsz) # 워밍업
+    start = time.perf_counter()
+    for frame in frames:
+        results = model(frame, verbose=False, device=device, conf=conf, imgsz=imgsz)
+        pose = PoseResult.from_yolo(results[0])
+        outputs.append((pose.boxes, pose.keypoints))
+    elapsed = time.perf_counter() - start
+    ms = elapsed * 1000.0 / len(frames) if frames else 0.0
+    return outputs, ms
+
+
+def compare_pose(reference, candidate, kpt_conf=0.5):
+    # 기준 결과 대비 (평균 키포인트 오차, 사람 검출률) 계산
+    errors = []
+    matched = 0
+    total = 0
+
+    for (ref_boxes, ref_kpts), (cand_boxes, cand_kpts) in zip(reference, candidate):
+        total += len(ref_boxes)
+        if len(ref_boxes) == 0 or len(cand_boxes) == 0:
+            continue
+
+        # 박스 중심 거리 기준 탐욕적 매칭
+        ref_c = (ref_boxes[:, :2] + ref_boxes[:, 2:4]) / 2
+        cand_c = (cand_boxes[:, :2] + cand_boxes[:, 2:4]) / 2
+        dist = np.linalg.norm(ref_c[:, None, :] - cand_c[None, :, :], axis=2)
+        diag = np.linalg.norm(ref_boxes[:, 2:4] - ref_boxes[:, :2], axis=1)
+        diag = np.maximum(diag, 1.0)
+
+        used = set()
+        for r in np.argsort(dist.min(axis=1)):
+            order = [c for c in np.argsort(dist[r]) if c not in used]
+            if not order or dist[r, order[0]] > diag[r] * 0.5:
+                continue
+            c = order[0]
+            used.add(c)
+            matched += 1
+
+            visible = ref_kpts[r, :, 2] >= kpt_conf
+            if not visible.any():
+                continue
+            d = np.linalg.norm(ref_kpts[r, visible, :2] - cand_kpts[c, visible, :2], axis=1)
+            errors.append(float(np.mean(d) / diag[r]))
+
+    mean_error = float(np.mean(errors)) if errors else 0.0
+    recall = matched / total if total else 1.0
+    return mean_error, recall
+
+
+def reference_imgsz(frame):
+    # 원본 해상도에 가장 가까운 stride 배수 (최대 1280)
+    longest = max(frame.shape[:2])
+    return int(min(1280, max(320, int(np.ceil(longest / 32.0)) * 32)))
+
+
+def auto_tune_imgsz(model, frames, conf=0.5, device='cpu', candidates=None,
+                    tolerance=DEFAULT_TOLERANCE, min_recall=DEFAULT_MIN_RECALL):
+    # 원본 크기 결과와 비슷한 결과를 내는 가장 작은 imgsz 선택
+    if not frames:
+        return None, []
+
+    full = reference_imgsz(frames[0])
+    sizes = sorted(s for s in (candidates or IMGSZ_CANDIDATES) if s < full)
+
+    reference, full_ms = run_clip(model, frames, full, conf, device)
+    report = [{'imgsz': full, 'ms': round(full_ms, 2), 'error': 0.0, 'recall': 1.0}]
+
+    best = full
+    for size in sizes:
+        outputs, ms = run_clip(model, frames, size, conf, device)
+        error, recall = compare_pose(reference, outputs)
+        ok = error <= tolerance and recall >= min_recall
+        report.append({'imgsz': size, 'ms': round(ms, 2), 'error': round(error, 4),
+                       'recall': round(recall, 3), 'ok': ok})
+        if ok:
+            best = size
+            break
+
+    return best, report
+
+
+def benchmark_int8(model_path, frames, imgsz=640, conf=0.5):
+    # FP32 vs INT8 (CPU) 속도 / 정확도 비교 리포트
+    fp32 = load_model(model_path)
+    int8 = load_model(export_int8(model_path))
+
+    ref, fp32_ms = run_clip(fp32, frames, imgsz, conf, 'cpu')
+    out, int8_ms = run_clip(int8, frames, imgsz, conf, 'cpu')
+    error, recall = compare_pose(ref, out)
+
+    return {
+        'model': model_path,
+        'imgsz': imgsz,
+        'fp32_ms': round(fp32_ms, 2),
+        'int8_ms': round(int8_ms, 2),
+        'speedup': round(fp32_ms / int8_ms, 2) if int8_ms > 0 else 0.0,
+        'error': round(error, 4),
+        'recall': round(recall, 3)
+    }
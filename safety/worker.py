@@ -0,0 +1,120 @@
+import os
+import hmac
+import time
+import uuid
+import ipaddress
+import threading
+import itertools
+from collections import deque
+from . import database
+
+# 워커 노드 (SAFETY_ROLE=worker)
+# - 코디네이터가 배정한 소스만 백그라운드 모니터링
+# - 감지 로그는 DB 대신 outbox 에 쌓고 코디네이터가 /worker/events 로 가져감
+#   (since = 코디네이터가 DB에 저장한 마지막 순번 -> 그 이하는 outbox 에서 삭제)
+# - /worker/* 는 SAFETY_WORKER_TOKEN 이 있으면 같은 토큰(X-Worker-Token)을 보낸 요청만,
+#   없으면 내부망(사설/루프백 주소)에서 온 요청만 허용
+# - /worker/status 로 소스별 처리 현황과 프로세스 CPU 사용률(부하)을 보고
+
+ROLE = os.environ.get('SAFETY_ROLE', 'standalone') # standalone / worker / coordinator
+OUTBOX_SIZE = 10000 # 코디네이터가 가져가기 전까지 보관할 최대 로그 수
+WORKER_TOKEN = os.environ.get('SAFETY_WORKER_TOKEN', '') # 코디네이터 <-> 워커 공유 비밀값
+TOKEN_HEADER = 'X-Worker-Token'
+
+BOOT_ID = uuid.uuid4().hex # 워커 재시작 감지용 (재시작 시 로그 순번 초기화)
+
+
+class EventOutbox:
+    # 순번이 붙은 로그 큐 (가장 오래된 것부터 버림)
+    def __init__(self, maxlen=OUTBOX_SIZE):
+        self.events = deque(maxlen=maxlen)
+        self.seq = 0
+        self.acked = 0 # 코디네이터가 저장을 확인한 마지막 순번
+        self.dropped = 0
+        self.lock = threading.Lock()
+
+    def push(self, timestamp, level, message, source, event=None):
+        with self.lock:
+            if len(self.events) == self.events.maxlen:
+                self.dropped += 1
+            self.seq += 1
+            self.events.append({'seq': self.seq, 'timestamp': timestamp, 'level': level,
+                                'message': message, 'source': source, 'event': event})
+
+    def since(self, seq, limit=1000):
+        # seq 까지는 저장 완료로 보고 삭제 (코디네이터가 재시작해도 다시 보내지 않음)
+        # -> seq 이후 로그 (최대 limit 개)
+        with self.lock:
+            if seq > self.acked:
+                self.acked = min(seq, self.seq)
+            while self.events and self.events[0]['seq'] <= self.acked:
+                self.events.popleft()
+            events = [e for e in itertools.islice(self.events, limit)]
+            return events, self.seq
+
+
+class LoadMeter:
+    # 프로세스 CPU 사용률 (모든 스레드 합계, 100 = 코어 1개)
+    def __init__(self):
+        self.last_wall = time.time()
+        self.last_cpu = time.process_time()
+        self.cpu = 0.0
+        self.lock = threading.Lock()
+
+    def sample(self):
+        with self.lock:
+            now, cpu = time.time(), time.process_time()
+            if now - self.last_wall >= 0.5:
+                self.cpu = (cpu - self.last_cpu) / (now - self.last_wall) * 100
+                self.last_wall, self.last_cpu = now, cpu
+            return self.cpu
+
+
+outbox = EventOutbox()
+load_meter = LoadMeter()
+
+
+def is_worker():
+    return ROLE == 'worker'
+
+
+def is_coordinator():
+    return ROLE == 'coordinator'
+
+
+def is_authorized(remote_addr, token):
+    # 코디네이터 요청인지 확인 (/worker/* 전용)
+    if WORKER_TOKEN:
+        return hmac.compare_digest(token or '', WORKER_TOKEN)
+    try:
+        addr = ipaddress.ip_address(remote_addr or '')
+    except ValueError:
+        return False
+    return addr.is_loopback or addr.is_private
+
+
+def enable_log_forwarding():
+    database.log_forwarder = outbox.push
+
+
+def assign(monitors, sources):
+    # 배정된 소스 {설정 키: 설정} 만 실행 (나머지는 중지)
+    monitors.retain(sources.keys())
+    started = []
+    for source_key, source_config in sources.items():
+        if monitors.apply_config(source_key, source_config) is not None:
+            started.append(source_key)
+    return started
+
+
+def status(monitors, ai_model):
+    return {
+        'boot_id': BOOT_ID,
+        'ready': ai_model.is_ready(),
+        'cpu': round(load_meter.sample(), 1),
+        'cpu_count': os.cpu_count(),
+        'sources': monitors.status(),
+        'event_seq': outbox.seq,
+        'event_acked': outbox.acked,
+        'events_dropped': outbox.dropped
+    }
@@ -0,0 +1,134 @@
+import sys
+import time
+import types
+import numpy as np
+import pytest
+from safety.model import AIModel
+
+
+class FakeYOLO:
+    # 가짜 모델: fail 에 있는 경로는 로딩 실패 (가중치 다운로드 실패 등)
+    fail = set()
+
+    def __init__(self, path, task=None):
+        if path in FakeYOLO.fail:
+            raise RuntimeError(f"cannot load {path}")
+        self.path = path
+
+    def __call__(self, frame, **kwargs):
+        return [types.SimpleNamespace(boxes=None, keypoints=None)]
+
+
+def wait_loaded(ai, timeout=5.0):
+    # 백그라운드 로딩이 끝날 때까지 (성공 또는 실패 후 load_thread 초기화)
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if ai.is_ready() or ai.load_thread is None:
+            return
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def fake_yolo(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'ultralytics', types.SimpleNamespace(YOLO=FakeYOLO))
+    monkeypatch.setattr(FakeYOLO, 'fail', set())
+    monkeypatch.setattr('safety.model.PoseResult.from_yolo', staticmethod(lambda r: None))
+
+
+def test_model_update_recovers_from_failed_background_load(fake_yolo):
+    FakeYOLO.fail.add('missing-pose.pt')
+    ai = AIModel('missing-pose.pt')
+    ai.device = 'cpu' # torch 없이 실행
+
+    ai.start_loading()
+    wait_loaded(ai)
+    assert not ai.is_ready() and ai.load_error
+    assert ai.load_thread is None # 다시 시도할 수 있음
+
+    # 사용자가 다른 모델로 교체하면 바로 준비 완료
+    assert ai.set_model('yolov8n-pose.pt')
+    assert ai.is_ready()
+    assert ai.load_error is None
+    assert ai.model.path == 'yolov8n-pose.pt'
+
+    # 준비된 뒤에는 백그라운드 로딩을 다시 시작하지 않음
+    ai.start_loading()
+    assert ai.load_thread is None
+
+
+def test_background_load_is_retried_after_failure(fake_yolo):
+    FakeYOLO.fail.add('yolov8n-pose.pt')
+    ai = AIModel('yolov8n-pose.pt')
+    ai.device = 'cpu'
+
+    ai.start_loading()
+    wait_loaded(ai)
+    assert ai.load_error and not ai.is_ready()
+
+    FakeYOLO.fail.clear() # 네트워크 복구 등
+    ai.start_loading()
+    wait_loaded(ai)
+    assert ai.is_ready()
+    assert ai.load_error is None
+
+
+def test_dashboard_events_and_heatmap_use_selected_source(monkeypatch, tmp_path):
+    # 모니터가 없는 소스 (대시보드 미리보기 경로): 선택한 소스 이름으로 기록
+    from safety import detector, heatmap
+    from safety.pose import PoseResult
+    monkeypatch.setattr(heatmap, 'HEATMAP_DIR', str(tmp_path))
+    store = heatmap.HeatmapStore()
+    monkeypatch.setattr(detector, 'heatmaps', store)
+    logged = []
+    monkeypatch.setattr(detector.database, 'insert_log',
+                        lambda level, message, source, event=None: logged.append((level, source, event)))
+
+    ai = AIModel()
+    ai.set_source('/uploads/clip.mp4', 'clip.mp4', {'fall_enabled': True})
+
+    # 가로로 넓은 박스 -> 쓰러짐 (danger)
+    keypoints = np.zeros((1, 17, 3), np.float32)
+    keypoints[0, :, :2] = (320, 300)
+    keypoints[0, :, 2] = 0.9
+    pose = PoseResult(np.array([[200, 250, 440, 350]], np.float32), np.array([0.9], np.float32), keypoints)
+    ai.detector.process_frame(np.zeros((480, 640, 3), np.uint8), pose, draw=False)
+
+    assert [(level, source) for level, source, _ in logged] == [('danger', 'clip.mp4')]
+    assert logged[0][2]['rule_type'] == 'fall'
+    assert store.find('webcam') is None
+    heat = store.find('clip.mp4').to_dict()
+    assert heat['totals'] == {'danger': 1, 'warning': 0}
+
+
+def test_partial_playback_keeps_cached_results(monkeypatch, tmp_path):
+    # 영상 끝까지 보지 않고 나가도 (구역 조정 중 새로고침 등) 추론 결과가 캐시에 남아야 함
+    import cv2
+    from functools import partial
+    from safety.pose import PoseResult
+    from safety.result_cache import PoseCache
+
+    clip = str(tmp_path / 'clip.avi')
+    writer = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*'MJPG'), 200, (64, 48))
+    for _ in range(30):
+        writer.write(np.zeros((48, 64, 3), np.uint8))
+    writer.release()
+
+    cache_dir = str(tmp_path / 'cache')
+    monkeypatch.setattr('safety.model.PoseCache', partial(PoseCache, cache_dir=cache_dir))
+    empty = PoseResult(np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros((0, 17, 3), np.float32))
+    monkeypatch.setattr('safety.model.PoseResult.from_yolo', staticmethod(lambda r: empty))
+
+    ai = AIModel()
+    ai.device = 'cpu'
+    ai.model = lambda frame, **kwargs: [None]
+    ai.ready.set()
+    ai.set_source(clip, 'clip.avi')
+
+    frames = ai.generate_frames()
+    for _ in range(10):
+        next(frames)
+    frames.close()
+
+    cache = PoseCache(clip, ai.model_key, cache_dir=cache_dir)
+    assert cache.get(2) is not None and cache.get(8) is not None # 3프레임마다 분석한 결과
+    assert cache.get(11) is None
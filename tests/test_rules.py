@@ -0,0 +1,44 @@
+import cv2
+import numpy as np
+from safety.rules import points_in_polygon, compile_rules, evaluate_rules, RuleContext
+
+
+def cv2_inside(points, poly):
+    contour = poly.reshape(-1, 1, 2).astype(np.int32)
+    return np.array([cv2.pointPolygonTest(contour, (int(x), int(y)), False) >= 0 for x, y in points])
+
+
+def test_boundary_points_match_cv2():
+    square = np.array([[0, 0], [100, 0], [100, 100], [0, 100]], np.int32)
+    points = np.array([[100, 50], [50, 100], [100, 100], [0, 0], [0, 50],
+                       [50, 50], [101, 50], [50, -1], [-1, -1]], np.int32)
+    assert points_in_polygon(points, square).tolist() == cv2_inside(points, square).tolist()
+    assert points_in_polygon(points[:3], square).all()
+
+
+def test_random_polygons_match_cv2():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        poly = rng.integers(0, 40, (rng.integers(3, 8), 2)).astype(np.int32)
+        # 격자 전체 (꼭짓점 / 변 위의 점 포함)
+        xs, ys = np.meshgrid(np.arange(-1, 42), np.arange(-1, 42))
+        points = np.stack([xs.ravel(), ys.ravel()], axis=1).astype(np.int32)
+        hull = cv2.convexHull(poly).reshape(-1, 2) # 자기 교차 없는 다각형
+        if len(hull) < 3:
+            continue
+        assert (points_in_polygon(points, hull) == cv2_inside(points, hull)).all()
+
+
+def test_nan_ref_is_false_for_not_equal():
+    rules = compile_rules([{
+        'name': 'wrist_not_nose',
+        'when': {'keypoint': 'left_wrist', 'axis': 'y', 'op': '!=', 'ref': 'nose'}
+    }])
+    kpts = np.zeros((2, 17, 3), np.float32)
+    kpts[:, :, 2] = 0.9
+    kpts[:, 9, 1] = [10, 20]
+    kpts[:, 0, 1] = [30, 40]
+    kpts[1, 0, 2] = 0.0 # 두 번째 사람은 코가 보이지 않음 -> ref 가 NaN
+    ctx = RuleContext(kpts, np.zeros((2, 4), np.float32), (), 0.5)
+    (_, mask), = evaluate_rules(rules, ctx)
+    assert mask.tolist() == [True, False]
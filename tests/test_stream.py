@@ -0,0 +1,114 @@
+import time
+import threading
+import numpy as np
+import pytest
+from safety import stream
+from safety.model import AIModel
+
+
+class FakeCapture:
+    # 계획표대로 동작하는 가짜 캡처: None = 연결 실패, 숫자 = 그만큼 프레임을 보내고 끊김
+    def __init__(self, plan, opens):
+        self.frames = plan.pop(0) if plan else 0
+        self.opened = self.frames is not None
+        opens.append(time.monotonic())
+
+    def isOpened(self):
+        return self.opened
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return 0
+
+    def read(self):
+        if not self.opened or self.frames == 0:
+            return False, None
+        if self.frames > 0:
+            self.frames -= 1
+        time.sleep(0.005)
+        return True, np.zeros((4, 4, 3), np.uint8)
+
+    def release(self):
+        self.opened = False
+
+
+@pytest.fixture
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(stream, 'BACKOFF_INITIAL', 0.05)
+    monkeypatch.setattr(stream, 'BACKOFF_MAX', 0.2)
+
+
+def wait_until(cond, timeout=5.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_reconnects_with_exponential_backoff(fast_backoff):
+    # 실패 3번 -> 연결(프레임 3개 후 끊김) -> 실패 -> 계속 연결
+    plan = [None, None, None, 3, None, -1]
+    opens = []
+    pool = stream.ReaderPool(opener=lambda src: FakeCapture(plan, opens))
+    handle = pool.acquire('rtsp://fake')
+    try:
+        assert wait_until(lambda: len(opens) >= 6)
+        reader = handle.reader
+        assert wait_until(lambda: reader.connected and reader.frames_read > 3)
+
+        gaps = np.diff(opens)
+        # 실패할 때마다 대기가 두 배 (0.05 -> 0.1 -> 0.2)
+        assert gaps[0] == pytest.approx(0.05, abs=0.04)
+        assert gaps[1] == pytest.approx(0.1, abs=0.05)
+        assert gaps[2] == pytest.approx(0.2, abs=0.05)
+        # 프레임을 받은 뒤 끊기면 처음 대기부터 다시 시작 (프레임 3개 읽는 시간 + 0.05 -> 다음 실패 후 0.1)
+        assert gaps[3] == pytest.approx(3 * 0.005 + 0.05, abs=0.04)
+        assert gaps[4] == pytest.approx(0.1, abs=0.05)
+
+        status = reader.status()
+        assert status['reconnects'] == 1
+        assert status['open_failures'] == 4
+        assert status['connected']
+
+        # 재연결 후에도 같은 핸들로 새 프레임을 계속 받음
+        ok, frame = handle.read(timeout=1.0)
+        assert ok and frame.shape == (4, 4, 3)
+    finally:
+        handle.release()
+    assert pool.status() == []
+    assert wait_until(lambda: not handle.reader.thread.is_alive())
+
+
+def test_backoff_is_capped(fast_backoff):
+    opens = []
+    pool = stream.ReaderPool(opener=lambda src: FakeCapture([None] * 100, opens))
+    handle = pool.acquire('rtsp://down')
+    try:
+        assert wait_until(lambda: len(opens) >= 6)
+        assert np.diff(opens)[-1] == pytest.approx(0.2, abs=0.05)
+        ok, frame = handle.read(timeout=0.1)
+        assert not ok and frame is None
+    finally:
+        handle.release()
+
+
+def test_generate_frames_yields_placeholder_while_reconnecting(fast_backoff, monkeypatch):
+    opens = []
+    monkeypatch.setattr(stream.readers, 'opener', lambda src: FakeCapture([None] * 1000, opens))
+    monkeypatch.setattr(stream, 'READ_TIMEOUT', 0.1)
+
+    ai = AIModel()
+    ai.load_thread = threading.current_thread() # 모델 로딩 생략 (원본 영상만 송출)
+    ai.source = 'rtsp://offline'
+
+    frames = ai.generate_frames()
+    chunk = next(frames) # 영상이 없어도 안내 화면을 보냄
+    assert chunk.startswith(b'--frame\r\n') and b'\xff\xd8' in chunk
+    assert stream.readers.status('rtsp://offline') is not None
+
+    frames.close() # 시청자 연결 종료 -> 공유 읽기 스레드 반환
+    assert stream.readers.status('rtsp://offline') is None